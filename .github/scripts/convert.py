@@ -1,92 +1,57 @@
 #!/usr/bin/env python3
-import re
+"""
+Convert an index Markdown file (e.g. GPT20.md) to the GitHub Pages HTML document.
 
-# Read the markdown file
-with open('agent/md/indices/GPT20.md', 'r') as f:
-    content = f.read()
-
-# Convert headers
-html_content = content
-html_content = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html_content, flags=re.MULTILINE)
-html_content = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html_content, flags=re.MULTILINE) 
-html_content = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html_content, flags=re.MULTILINE)
-
-# Convert bold and italic text
-html_content = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html_content)
-html_content = re.sub(r'_(.+?)_', r'<em>\1</em>', html_content)
-
-# Process numbered lists properly
-lines = html_content.split('\n')
-result_lines = []
-i = 0
-
-while i < len(lines):
-    line = lines[i]
-    
-    # Check if this is the start of a numbered list
-    if re.match(r'^\d+\.\s', line):
-        result_lines.append('<ol>')
-        
-        # Process all numbered list items (including ones separated by empty lines)
-        while i < len(lines):
-            current_line = lines[i]
-            
-            if re.match(r'^\d+\.\s', current_line):
-                list_content = re.sub(r'^\d+\.\s(.+)', r'\1', current_line)
-                
-                # Check if next line is description (indented or continuation)
-                if i + 1 < len(lines) and lines[i + 1].strip() and not re.match(r'^\d+\.\s', lines[i + 1]) and not lines[i + 1].startswith('#'):
-                    description = lines[i + 1].strip()
-                    result_lines.append(f'<li>{list_content}<br>{description}</li>')
-                    i += 2  # Skip both lines
-                else:
-                    result_lines.append(f'<li>{list_content}</li>')
-                    i += 1
-                
-                # Skip empty lines after list items
-                while i < len(lines) and lines[i].strip() == '':
-                    i += 1
-            else:
-                # If we hit a non-numbered line that's not empty, break
-                if current_line.strip():
-                    break
-                i += 1
-        
-        result_lines.append('</ol>')
-    elif line.startswith('- '):
-        # Handle bullet lists
-        result_lines.append('<ul>')
-        while i < len(lines) and lines[i].startswith('- '):
-            content = lines[i][2:]
-            result_lines.append(f'<li>{content}</li>')
-            i += 1
-        result_lines.append('</ul>')
-    else:
-        result_lines.append(line)
-        i += 1
+The document is read line by line and HTML is written as it is produced, in a
+single pass with precompiled patterns, so large or multiple index pages convert
+in linear time. Importable: ``convert(source, destination)``; as a script it
+keeps the old defaults (agent/md/indices/GPT20.md -> docs/index.html).
 
-html_content = '\n'.join(result_lines)
+With ``--incremental`` the page is rebuilt from per-block fragments: blocks whose
+source hash is in the manifest next to the page are copied from the previous
+page, and nothing is written when only the timestamp lines changed.
 
-# Convert paragraphs
-paragraphs = html_content.split('\n\n')
-final_content = []
+The page ends with a performance chart that the browser draws from the precomputed
+``chart-data.json`` next to it (see agent/src/chart_data.py); without that file the
+chart section stays hidden.
+"""
 
-for para in paragraphs:
-    para = para.strip()
-    if para and not para.startswith('<') and not re.match(r'.*</?(h[123]|ol|ul|li).*>', para):
-        final_content.append(f'<p>{para}</p>')
-    elif para:
-        final_content.append(para)
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
 
-html_content = '\n\n'.join(final_content)
+DEFAULT_SOURCE = Path("agent/md/indices/GPT20.md")
+DEFAULT_DESTINATION = Path("docs/index.html")
+DEFAULT_TITLE = "GPT20 Stock Index"
+MANIFEST_NAME = ".index-manifest.json"  # Dotfile so GitHub Pages does not publish it
+MANIFEST_VERSION = 2
 
-# Create full HTML document
-full_html = f'''<!DOCTYPE html>
+# Lines that change on every generation without changing the index
+TIMESTAMP_PREFIXES = ("**Last Updated:**", "*Generated automatically from portfolio database on ")
+
+HEADER_PATTERNS = [
+    (re.compile(r"^# (.+)$"), r"<h1>\1</h1>"),
+    (re.compile(r"^## (.+)$"), r"<h2>\1</h2>"),
+    (re.compile(r"^### (.+)$"), r"<h3>\1</h3>"),
+]
+BOLD_PATTERN = re.compile(r"\*\*(.+?)\*\*")
+EMPHASIS_PATTERN = re.compile(r"_(.+?)_")
+NUMBERED_ITEM_PATTERN = re.compile(r"^\d+\.\s")
+NUMBERED_CONTENT_PATTERN = re.compile(r"^\d+\.\s(.+)")
+BLOCK_TAG_PATTERN = re.compile(r".*</?(h[123]|ol|ul|li).*>")
+
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>GPT20 Stock Index</title>
+    <title>{title}</title>
     <style>
         body {{ 
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; 
@@ -106,13 +71,326 @@ full_html = f'''<!DOCTYPE html>
 </head>
 <body>
     <div id="content">
-        {html_content}
+        """
+
+PAGE_TAIL = """
     </div>
+    <div id="chart" hidden>
+        <h2>Performance</h2>
+        <svg id="chart-plot" viewBox="0 0 800 260" width="100%" role="img" aria-label="Index vs benchmark"></svg>
+        <p id="chart-legend"></p>
+        <ol id="chart-contributors"></ol>
+    </div>
+    <script>
+        // chart-data.json is precomputed by agent/src/chart_data.py as delta-encoded integers
+        fetch("chart-data.json").then(r => r.ok ? r.json() : null).then(data => {
+            if (!data || !data.days.length) return;
+            const decode = deltas => { let total = 0; return deltas.map(d => (total += d) / data.scale); };
+            const nav = decode(data.series.nav), bench = decode(data.series.benchmark);
+            const low = Math.min(...nav, ...bench), high = Math.max(...nav, ...bench);
+            const x = i => nav.length > 1 ? i / (nav.length - 1) * 800 : 400;
+            const y = v => 250 - (v - low) / ((high - low) || 1) * 240;
+            const line = (values, color) => `<polyline fill="none" stroke="${color}" stroke-width="2" points="${
+                values.map((v, i) => x(i).toFixed(1) + "," + y(v).toFixed(1)).join(" ")}"/>`;
+            const signed = v => (v >= 0 ? "+" : "") + v.toFixed(2);
+            document.getElementById("chart-plot").innerHTML = line(bench, "#95a5a6") + line(nav, "#2980b9");
+            document.getElementById("chart-legend").innerHTML = `<strong>${data.index}</strong> ${
+                signed(nav[nav.length - 1] - 100)}% vs <em>${data.benchmark}</em> ${
+                signed(bench[bench.length - 1] - 100)}% since ${data.start}`;
+            const contributors = Object.entries(data.contributions)
+                .map(([ticker, deltas]) => [ticker, deltas.reduce((a, b) => a + b, 0) / data.scale])
+                .sort((a, b) => Math.abs(b[1]) - Math.abs(a[1])).slice(0, 5);
+            document.getElementById("chart-contributors").innerHTML = contributors
+                .map(([ticker, points]) => `<li>${ticker}: ${signed(points)} pts</li>`).join("");
+            document.getElementById("chart").hidden = false;
+        }).catch(() => {});
+    </script>
 </body>
-</html>'''
+</html>"""
+
+
+def convert_inline(line: str) -> str:
+    """Apply header, bold and emphasis markup to one line."""
+    for pattern, replacement in HEADER_PATTERNS:
+        line = pattern.sub(replacement, line)
+    line = BOLD_PATTERN.sub(r"<strong>\1</strong>", line)
+    return EMPHASIS_PATTERN.sub(r"<em>\1</em>", line)
+
+
+def convert_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Group numbered and bulleted items into lists, passing other lines through.
+
+    A numbered item absorbs the next line as its description when that line is
+    not blank, not another item and not a raw ``#`` line; blank lines after an
+    item are skipped so consecutive items share one list.
+    """
+    lines = iter(lines)
+    line = next(lines, None)
+    while line is not None:
+        if NUMBERED_ITEM_PATTERN.match(line):
+            yield "<ol>"
+            while line is not None and NUMBERED_ITEM_PATTERN.match(line):
+                match = NUMBERED_CONTENT_PATTERN.match(line)
+                content = match.group(1) if match else line
+                following = next(lines, None)
+                if (
+                    following is not None
+                    and following.strip()
+                    and not NUMBERED_ITEM_PATTERN.match(following)
+                    and not following.startswith("#")
+                ):
+                    yield f"<li>{content}<br>{following.strip()}</li>"
+                    following = next(lines, None)
+                else:
+                    yield f"<li>{content}</li>"
+
+                while following is not None and not following.strip():
+                    following = next(lines, None)
+                line = following
+            yield "</ol>"
+        elif line.startswith("- "):
+            yield "<ul>"
+            while line is not None and line.startswith("- "):
+                yield f"<li>{line[2:]}</li>"
+                line = next(lines, None)
+            yield "</ul>"
+        else:
+            yield line
+            line = next(lines, None)
+
+
+def _paragraph(lines: List[str]) -> str:
+    text = "\n".join(lines).strip()
+    if text and not text.startswith("<") and not BLOCK_TAG_PATTERN.match(text):
+        return f"<p>{text}</p>"
+    return text
+
+
+def convert_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """Split blocks on empty lines and wrap plain-text paragraphs in ``<p>``."""
+    pending: List[str] = []
+    for line in lines:
+        if line:
+            pending.append(line)
+            continue
+        paragraph = _paragraph(pending)
+        if paragraph:
+            yield paragraph
+        pending = []
+
+    paragraph = _paragraph(pending)
+    if paragraph:
+        yield paragraph
+
+
+def markdown_to_html(lines: Iterable[str]) -> Iterator[str]:
+    """Convert Markdown lines (without newlines) to the content HTML, yielded one paragraph at a time."""
+    inline = (convert_inline(line) for line in lines)
+    for i, paragraph in enumerate(convert_paragraphs(convert_blocks(inline))):
+        yield paragraph if i == 0 else "\n\n" + paragraph
+
+
+def write_page(source: TextIO, destination: TextIO, title: str = DEFAULT_TITLE) -> None:
+    """Stream a full HTML page for the Markdown in ``source`` into ``destination``."""
+    destination.write(PAGE_HEAD.format(title=title))
+    for chunk in markdown_to_html(line.rstrip("\n") for line in source):
+        destination.write(chunk)
+    destination.write(PAGE_TAIL)
+
+
+def _file_mode(path: Path) -> int:
+    # mkstemp creates 0600 files; keep the page's current mode (or the umask default for a new one)
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def convert(source: Path, destination: Path, title: str = DEFAULT_TITLE) -> Path:
+    """
+    Convert the Markdown file ``source`` to an HTML page at ``destination``.
+
+    The page is written to a temporary file next to ``destination`` and moved
+    into place, so a failed conversion never leaves a partial page.
+    """
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, suffix=".html.tmp")
+    try:
+        with open(source, "r", encoding="utf-8") as src, os.fdopen(fd, "w", encoding="utf-8") as dst:
+            write_page(src, dst, title)
+        os.chmod(tmp_path, _file_mode(destination))
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return destination
+
+
+def read_blocks(source: TextIO) -> Iterator[List[str]]:
+    """Yield the Markdown in ``source`` as groups of lines separated by empty lines."""
+    block: List[str] = []
+    for line in source:
+        line = line.rstrip("\n")
+        if line:
+            block.append(line)
+        elif block:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def _hash_lines(lines: Iterable[str]) -> str:
+    digest = hashlib.sha256()
+    for line in lines:
+        digest.update(line.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def _load_manifest(manifest_path: Path, destination: Path, title: str) -> Optional[Dict]:
+    # The manifest is only usable if it describes the page that is actually on disk
+    if not manifest_path.exists() or not destination.exists():
+        return None
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    page = destination.read_text(encoding="utf-8")
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("title") != title
+        or manifest.get("page_hash") != _hash_lines([page])
+    ):
+        return None
+    manifest["page"] = page
+    return manifest
+
+
+def build_incremental(
+    source: Path, destination: Path, title: str = DEFAULT_TITLE, manifest_path: Optional[Path] = None
+) -> Dict:
+    """
+    Rebuild ``destination`` from ``source``, re-rendering only blocks that changed.
+
+    The source is split into segments at empty lines. A segment is extended over
+    the next block when it ends inside a numbered list, because the converter
+    carries list state across blank lines. Each segment's source hash, its offset
+    in the page and that list flag are recorded in the manifest; unchanged segments
+    are copied from the previous page. If the source is unchanged apart from its
+    timestamp lines, the existing page and manifest are left untouched.
+
+    Returns:
+        dict with ``written`` plus the number of segments and how many were re-rendered
+    """
+    destination = Path(destination)
+    manifest_path = Path(manifest_path or destination.parent / MANIFEST_NAME)
+    previous = _load_manifest(manifest_path, destination, title)
+    known = {entry["hash"]: entry for entry in previous["segments"]} if previous else {}
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, suffix=".html.tmp")
+    # The page template is part of the content, so template changes are never skipped as timestamp-only
+    content_digest = hashlib.sha256(f"{MANIFEST_VERSION}\n{title}\n{PAGE_HEAD}{PAGE_TAIL}".encode("utf-8"))
+    segments: List[Dict] = []
+    rendered = 0
+    try:
+        with open(source, "r", encoding="utf-8") as src, os.fdopen(fd, "w", encoding="utf-8") as dst:
+            head = PAGE_HEAD.format(title=title)
+            dst.write(head)
+            position, wrote_content = len(head), False
+
+            def emit(segment_hash: str, html: str, continues: bool) -> None:
+                nonlocal position, wrote_content
+                if html and wrote_content:
+                    dst.write("\n\n")
+                    position += 2
+                dst.write(html)
+                segments.append({"hash": segment_hash, "offset": position, "length": len(html), "continues": continues})
+                position += len(html)
+                wrote_content = wrote_content or bool(html)
+
+            pending: List[str] = []
+            for block in read_blocks(src):
+                for line in block:
+                    masked = "<timestamp>" if line.startswith(TIMESTAMP_PREFIXES) else line
+                    content_digest.update(masked.encode("utf-8") + b"\n")
+                # Blank lines split paragraphs and detach list item details, so block boundaries are content too
+                content_digest.update(b"\n")
+
+                pending = pending + [""] + block if pending else block
+                segment_hash = _hash_lines(pending)
+                entry = known.get(segment_hash)
+                if entry is not None:
+                    html = previous["page"][entry["offset"] : entry["offset"] + entry["length"]]
+                    continues = entry["continues"]
+                else:
+                    body = list(convert_blocks(convert_inline(line) for line in pending))
+                    continues = bool(body) and body[-1] == "</ol>"
+                    if continues:
+                        continue
+                    html = "\n\n".join(convert_paragraphs(body))
+                    rendered += 1
+
+                if not continues:
+                    emit(segment_hash, html, continues)
+                    pending = []
+
+            if pending:
+                # The source ended inside a list, so nothing follows that could extend it
+                body = convert_blocks(convert_inline(line) for line in pending)
+                emit(_hash_lines(pending), "\n\n".join(convert_paragraphs(body)), True)
+                rendered += 1
+            dst.write(PAGE_TAIL)
+
+        content_hash = content_digest.hexdigest()
+        if previous and previous.get("content_hash") == content_hash:
+            os.unlink(tmp_path)
+            return {"written": False, "segments": len(segments), "rendered": 0}
+
+        page = Path(tmp_path).read_text(encoding="utf-8")
+        os.chmod(tmp_path, _file_mode(destination))
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "title": title,
+        "content_hash": content_hash,
+        "page_hash": _hash_lines([page]),
+        "segments": segments,
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=1) + "\n", encoding="utf-8")
+    return {"written": True, "segments": len(segments), "rendered": rendered}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert an index Markdown file to an HTML page")
+    parser.add_argument("source", nargs="?", type=Path, default=DEFAULT_SOURCE, help="Markdown index file")
+    parser.add_argument("destination", nargs="?", type=Path, default=DEFAULT_DESTINATION, help="HTML output file")
+    parser.add_argument("--title", default=DEFAULT_TITLE, help="page title")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"re-render only changed blocks (tracked in {MANIFEST_NAME}); skip timestamp-only changes",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.incremental:
+        convert(args.source, args.destination, args.title)
+        print("HTML updated successfully")
+        return 0
+
+    result = build_incremental(args.source, args.destination, args.title)
+    if result["written"]:
+        print(f"HTML updated successfully ({result['rendered']} of {result['segments']} blocks re-rendered)")
+    else:
+        print("No changes besides timestamps; HTML left as is")
+    return 0
 
-# Write to docs/index.html
-with open('docs/index.html', 'w') as f:
-    f.write(full_html)
 
-print("HTML updated successfully")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
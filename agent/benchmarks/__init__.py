@@ -0,0 +1 @@
+"""Benchmark harness for the agent tool layer and markdown pipeline."""
@@ -0,0 +1,125 @@
+"""Synthetic market data fixtures for the benchmark harness."""
+
+import json
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ..src.config import MARKET_INDICES
+
+# Feasible rebalancing inputs ("TICKER:conviction" pairs, sector codes with -1 for no sector cap)
+# that the solver once reported as infeasible
+REBALANCE_REGRESSIONS = [
+    (
+        "T0:0.05,T1:0.46,T2:1.3,T3:0.01,T4:2.22,T5:13.93,T6:0.02,T7:6.6,T8:2.33,T9:2.55,"
+        "T10:2.3,T11:17.94,T12:0.36,T13:0.37,T14:0.07,T15:1.65,T16:0.01,T17:0.1,T18:0.02,T19:0.4",
+        [1, -1, 0, 0, 0, 1, 1, 1, 1, -1, 1, 1, 1, -1, 1, 0, -1, 1, 1, 0],
+    ),
+]
+
+SECTORS = ["Technology", "Healthcare", "Financial Services", "Consumer Cyclical", "Industrials", "Energy"]
+
+
+def synthetic_tickers(count: int) -> List[str]:
+    """Return ``count`` deterministic fake ticker symbols (T0000, T0001, ...)."""
+    return [f"T{i:04d}" for i in range(count)]
+
+
+def write_synthetic_fixtures(root: Path, tickers: List[str], years: int = 5, seed: int = 0) -> Path:
+    """
+    Write a FixtureProvider data set of random-walk bars and info dicts.
+
+    The market indices from ``MARKET_INDICES`` are always included so the
+    market summary and benchmark-relative metrics have data.
+
+    Returns:
+        the fixture root
+    """
+    rng = np.random.default_rng(seed)
+    as_of = date(2025, 8, 1)
+    sessions = pd.bdate_range(end=as_of, periods=252 * years, name="Date")
+
+    (root / "bars").mkdir(parents=True, exist_ok=True)
+    (root / "info").mkdir(parents=True, exist_ok=True)
+
+    symbols = list(dict.fromkeys(tickers + list(MARKET_INDICES.values())))
+    for i, ticker in enumerate(symbols):
+        returns = rng.normal(0.0004, 0.018, len(sessions))
+        close = 50 * np.exp(np.cumsum(returns))
+        spread = np.abs(rng.normal(0, 0.01, len(sessions))) * close
+        bars = pd.DataFrame(
+            {
+                "Open": close * (1 + rng.normal(0, 0.004, len(sessions))),
+                "High": close + spread,
+                "Low": close - spread,
+                "Close": close,
+                "Volume": rng.integers(1_000_000, 50_000_000, len(sessions)),
+            },
+            index=sessions,
+        )
+        bars.to_csv(root / "bars" / f"{ticker}.csv", index_label="Date")
+
+        info = {
+            "longName": f"{ticker} Holdings Inc.",
+            "currentPrice": round(float(close[-1]), 2),
+            "previousClose": round(float(close[-2]), 2),
+            "marketCap": int(rng.integers(10**9, 3 * 10**12)),
+            "trailingPE": round(float(rng.uniform(8, 60)), 2),
+            "forwardPE": round(float(rng.uniform(8, 45)), 2),
+            "dividendYield": round(float(rng.uniform(0, 4)), 2),
+            "fiftyTwoWeekHigh": round(float(close[-252:].max()), 2),
+            "fiftyTwoWeekLow": round(float(close[-252:].min()), 2),
+            "sector": SECTORS[i % len(SECTORS)],
+            "industry": "Synthetic",
+        }
+        (root / "info" / f"{ticker}.json").write_text(json.dumps(info), encoding="utf-8")
+
+    (root / "manifest.json").write_text(json.dumps({"as_of": as_of.isoformat(), "source": "synthetic"}))
+    return root
+
+
+def synthetic_index_markdown(tickers: List[str]) -> str:
+    """Render a GPT20.md-style index document holding ``tickers`` at equal weight."""
+    weight = 100 / len(tickers)
+    lines = [
+        "# GPT20 - AI-Curated Stock Index",
+        "",
+        "*An algorithmically-managed portfolio, generated for benchmarking.*",
+        "",
+        "**Last Updated:** August 1, 2025 at 10:25 PM EST",
+        "",
+        "## Current Holdings",
+        "",
+    ]
+    for i, ticker in enumerate(tickers, start=1):
+        lines += [
+            f"{i}. **{ticker} Holdings Inc. ({ticker})** - {weight:.3f}% ",
+            "   *Current Price: $100.00*",
+            "   ",
+            "   GROWTH: Synthetic holding used by the benchmark harness",
+            "",
+        ]
+    lines += ["---", "", "## Methodology", "", "- **Benchmark**: synthetic data", ""]
+    return "\n".join(lines)
+
+
+def synthetic_index_versions(tickers: List[str], count: int, holdings: int = 20, seed: int = 0) -> List[Dict]:
+    """
+    Build ``count`` backtest index versions (see ``backtest.index_versions``), one per session up to the fixture date.
+
+    Each version holds a random ``holdings`` of ``tickers`` at random weights.
+    """
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range(end=date(2025, 8, 1), periods=count)
+    size = min(holdings, len(tickers))
+    return [
+        {
+            "commit": f"{i:040x}",
+            "date": session,
+            "holdings": dict(zip(rng.choice(tickers, size, replace=False), rng.uniform(2, 12, size).tolist())),
+        }
+        for i, session in enumerate(sessions)
+    ]
@@ -0,0 +1,238 @@
+"""
+Local HTTP stand-in for Yahoo Finance that replays a fixture set.
+
+Serves the ``info`` and ``history`` calls of the tool layer from a FixtureProvider
+directory (recorded with ``MARKET_DATA_PROVIDER=record`` or ``FixtureProvider.record``,
+or synthetic) with configurable latency, a token-bucket rate limit answered with
+429 + ``Retry-After``, and randomly injected 503s. Point the agent or the benchmark
+harness at it with ``MARKET_DATA_PROVIDER=http`` (``HTTPProvider``).
+
+Usage (from the project root):
+    python -m agent.benchmarks.replay_server --fixtures agent/data/fixtures --port 8090
+    python -m agent.benchmarks.replay_server --fixtures DIR --latency-ms 80 --jitter-ms 40 --rate 20 --error-rate 0.02
+
+Endpoints: ``/manifest``, ``/info/<TICKER>``, ``/history?tickers=A,B&period=1y|start=YYYY-MM-DD``
+and ``/stats`` (request, throttle and error counters; never throttled).
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+from ..src.config import MARKET_DATA_FIXTURES_DIR
+from ..src.tools.providers import COLUMNS, FixtureProvider
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[float]:
+        """Take a token; returns None on success or the seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate
+
+
+class ReplayServer:
+    """
+    Threaded replay server, usable as a context manager from benchmarks.
+
+    Args:
+        fixtures: FixtureProvider directory to serve
+        port: TCP port (0 picks a free one; see ``url``)
+        latency_ms: Delay added to every data response
+        jitter_ms: Uniform random extra delay on top of ``latency_ms``
+        rate: Sustained requests per second before throttling (None for no limit)
+        burst: Token-bucket size; defaults to one second of ``rate``
+        error_rate: Fraction of data requests answered with 503
+        seed: Seed for jitter and error injection
+    """
+
+    def __init__(
+        self,
+        fixtures=None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.provider = FixtureProvider(fixtures or MARKET_DATA_FIXTURES_DIR)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bucket = TokenBucket(rate, burst or max(1, int(rate))) if rate else None
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._stats = {"requests": 0, "throttled": 0, "errors": 0, "not_found": 0, "info": 0, "history": 0}
+        self._stats_lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the pooled client sessions
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, payload, headers: Optional[Dict] = None) -> None:
+        body = json.dumps(payload, default=str).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        url = urlparse(handler.path)
+        if url.path == "/stats":
+            self._send(handler, 200, self.stats())
+            return
+        if url.path == "/manifest":
+            self._send(handler, 200, {"as_of": self.provider.today().isoformat()})
+            return
+
+        self._count("requests")
+        if self.bucket is not None:
+            wait = self.bucket.acquire()
+            if wait is not None:
+                self._count("throttled")
+                self._send(handler, 429, {"error": "Too Many Requests"}, {"Retry-After": f"{wait:.3f}"})
+                return
+
+        with self._stats_lock:
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay / 1000)
+        if failed:
+            self._count("errors")
+            self._send(handler, 503, {"error": "Service Unavailable"})
+            return
+
+        if url.path.startswith("/info/"):
+            self._count("info")
+            try:
+                self._send(handler, 200, self.provider.info(unquote(url.path[len("/info/") :])))
+            except KeyError as e:
+                self._count("not_found")
+                self._send(handler, 404, {"error": str(e)})
+            return
+
+        if url.path == "/history":
+            self._count("history")
+            query = parse_qs(url.query)
+            tickers = [t for t in query.get("tickers", [""])[0].split(",") if t]
+            start = query.get("start", [None])[0]
+            period = query.get("period", [None])[0]
+            frames = self.provider.history(tickers, period=None if start else period, start=start)
+            payload = {
+                ticker: {
+                    "Date": pd.DatetimeIndex(bars.index).strftime("%Y-%m-%d").tolist(),
+                    **{c: bars[c].tolist() for c in COLUMNS},
+                }
+                for ticker, bars in frames.items()
+            }
+            self._send(handler, 200, payload)
+            return
+
+        self._count("not_found")
+        self._send(handler, 404, {"error": f"Unknown path {url.path}"})
+
+    def start(self) -> "ReplayServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded market data over HTTP")
+    parser.add_argument("--fixtures", type=Path, default=MARKET_DATA_FIXTURES_DIR, help="fixture directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every data response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform random extra delay")
+    parser.add_argument("--rate", type=float, help="requests per second before answering 429")
+    parser.add_argument("--burst", type=int, help="token-bucket size (default: one second of --rate)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = ReplayServer(
+        args.fixtures,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate=args.rate,
+        burst=args.burst,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Replaying {args.fixtures} on {server.url} (Ctrl-C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+"""
+Benchmark harness for the agent's tool layer and the markdown pipeline.
+
+Runs every tool against fixture data (synthetic by default) at several
+ticker-universe sizes, reports latency percentiles, peak allocations and
+payload sizes, and compares the results with a stored baseline.
+
+Usage (from the project root):
+    python -m agent.benchmarks                      # run and compare with baseline.json
+    python -m agent.benchmarks --save-baseline      # run and overwrite the baseline
+    python -m agent.benchmarks --scales 20 200 --repeat 5
+    python -m agent.benchmarks --replay --latency-ms 50 --rate 100   # through the HTTP replay server
+
+Besides the tool cases (plus a backtest over 1250 rebalances, and the rebalancing
+solver on inputs it once got wrong, which fails the run if an index rule is broken),
+a "startup" section times fresh interpreters importing the agent entry point (what runs before the
+prompt menu) and the full tool layer, and prints an ``-X importtime`` summary of
+the heaviest top-level packages.
+"""
+
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..src.backtest import run_backtest
+from ..src.tools import (
+    compare_stocks_performance,
+    get_market_summary,
+    get_multiple_stocks_info,
+    get_stock_history,
+    get_stock_info,
+    read_index,
+    write_index,
+)
+from ..src.config import PORTFOLIO_CONSTRAINTS
+from ..src.tools.bar_store import set_store_root
+from ..src.tools.cache import market_cache
+from ..src.tools.providers import FixtureProvider, HTTPProvider, set_provider
+from ..src.tools.rebalancing import check_constraints, round_weights, solve_weights
+from ..src.tools.scheduler import format_scheduler_stats, market_data_scheduler
+from .fixtures import (
+    REBALANCE_REGRESSIONS,
+    synthetic_index_markdown,
+    synthetic_index_versions,
+    synthetic_tickers,
+    write_synthetic_fixtures,
+)
+from .replay_server import ReplayServer
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CONVERT_SCRIPT = PROJECT_ROOT / ".github" / "scripts" / "convert.py"
+
+DEFAULT_SCALES = [20, 200, 2000]
+# Entry point up to the prompt menu / health check, and the first tool call
+STARTUP_MODULES = ["agent.src.main", "agent.src.tools.financial_data"]
+BACKTEST_VERSIONS = 1250
+HISTORY_PERIODS = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _payload_bytes(result) -> int:
+    return len(json.dumps(result, default=str).encode("utf-8"))
+
+
+def measure(fn: Callable[[], object], repeat: int, warm_cache: bool = False) -> Dict:
+    """
+    Time ``fn`` ``repeat`` times and measure one extra traced run for allocations.
+
+    The memo cache is cleared before every run unless ``warm_cache`` is set,
+    so by default the numbers cover the full tool path down to the bar store.
+    """
+    samples = []
+    result = None
+    for _ in range(repeat):
+        if not warm_cache:
+            market_cache.clear()
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    if not warm_cache:
+        market_cache.clear()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "payload_bytes": _payload_bytes(result),
+    }
+
+
+def _run_convert(workdir: Path, markdown: str, *args: str) -> Callable[[], object]:
+    """Prepare a scratch checkout layout for convert.py and return a callable that runs it with ``args``."""
+    (workdir / "agent" / "md" / "indices").mkdir(parents=True, exist_ok=True)
+    (workdir / "docs").mkdir(exist_ok=True)
+    (workdir / "agent" / "md" / "indices" / "GPT20.md").write_text(markdown, encoding="utf-8")
+
+    def run():
+        subprocess.run([sys.executable, str(CONVERT_SCRIPT), *args], cwd=workdir, check=True, capture_output=True)
+        return (workdir / "docs" / "index.html").read_text(encoding="utf-8")
+
+    return run
+
+
+def run_scale(
+    scale: int, workdir: Path, repeat: int, fixtures_dir: Optional[Path] = None, replay: Optional[Dict] = None
+) -> Dict[str, Dict]:
+    """
+    Run every benchmark case against a universe of ``scale`` tickers.
+
+    With ``replay`` (ReplayServer options) the fixtures are served over HTTP with that
+    latency, rate limit and error rate, and the tools read them through ``HTTPProvider``.
+    """
+    if fixtures_dir is None:
+        fixtures_dir = workdir / "fixtures"
+        write_synthetic_fixtures(fixtures_dir, synthetic_tickers(scale))
+    if replay is None:
+        return _run_cases(scale, workdir, repeat, fixtures_dir, FixtureProvider(fixtures_dir))
+
+    market_data_scheduler.reset_stats()
+    with ReplayServer(fixtures_dir, **replay) as server:
+        results = _run_cases(scale, workdir, repeat, fixtures_dir, HTTPProvider(server.url))
+        stats = server.stats()
+    print(
+        f"  replay server: {stats['requests']} requests, {stats['throttled']} throttled, "
+        f"{stats['errors']} injected errors"
+    )
+    print(f"  scheduler: {format_scheduler_stats(market_data_scheduler.stats())}")
+    return results
+
+
+def _solve_regressions() -> List[List[float]]:
+    """Solve every known-feasible rebalancing input; raises if one comes back breaking an index rule."""
+    solved = []
+    for convictions, codes in REBALANCE_REGRESSIONS:
+        targets = np.array([float(pair.split(":")[1]) for pair in convictions.split(",")])
+        weights = solve_weights(targets, np.array(codes))
+        weights = round_weights(weights, PORTFOLIO_CONSTRAINTS["max_weight"])
+        violations = check_constraints(weights, [f"S{code}" if code >= 0 else None for code in codes])
+        if violations:
+            raise AssertionError(f"solve_weights regression for {convictions}: {'; '.join(violations)}")
+        solved.append(weights.tolist())
+    return solved
+
+
+def _run_cases(scale: int, workdir: Path, repeat: int, fixtures_dir: Path, provider) -> Dict[str, Dict]:
+    tickers = sorted(p.stem for p in (fixtures_dir / "bars").glob("*.csv") if not p.stem.startswith("^"))[:scale]
+    ticker_csv = ",".join(tickers)
+
+    set_provider(provider)
+    set_store_root(workdir / "bars")
+
+    # Seed the bar store once so every case measures the steady state of a run
+    compare_stocks_performance(ticker_csv, "max")
+
+    rotation = itertools.cycle(tickers)
+
+    def next_ticker():
+        return next(rotation)
+
+    cases: Dict[str, Callable[[], object]] = {
+        "get_stock_info": lambda: get_stock_info(next_ticker()),
+        "get_multiple_stocks_info": lambda: get_multiple_stocks_info(ticker_csv),
+        "compare_stocks_performance": lambda: compare_stocks_performance(ticker_csv, "1y"),
+        "get_market_summary": lambda: get_market_summary(),
+    }
+    for period in HISTORY_PERIODS:
+        cases[f"get_stock_history[{period}]"] = lambda period=period: get_stock_history(next_ticker(), period)
+
+    # Index files are written outside the repo: an absolute index name overrides the indices directory
+    index_path = str(workdir / "BENCH.md")
+    markdown = synthetic_index_markdown(tickers)
+    cases["write_index"] = lambda: write_index(index_path, markdown)
+    cases["read_index"] = lambda: read_index(index_path)
+    cases["convert.py"] = _run_convert(workdir / "convert", markdown)
+    # Steady state of the Pages build: the manifest is current, so unchanged blocks are reused
+    cases["convert.py --incremental"] = _run_convert(workdir / "convert-incremental", markdown, "--incremental")
+    # A rebalance every session of the fixture history
+    versions = synthetic_index_versions(tickers, BACKTEST_VERSIONS)
+    cases["backtest"] = lambda: run_backtest(versions=versions)
+    cases["solve_weights"] = _solve_regressions
+
+    results = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, repeat)
+        print(f"  {name:<32} p50 {results[name]['p50_ms']:>10.3f} ms  p95 {results[name]['p95_ms']:>10.3f} ms")
+    return results
+
+
+def _import_command(module: str, *flags: str) -> List[str]:
+    return [sys.executable, *flags, "-c", f"import {module}"]
+
+
+def measure_startup(module: str, repeat: int) -> Dict:
+    """Time ``import module`` in fresh interpreters started from the project root."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(_import_command(module), cwd=PROJECT_ROOT, check=True, capture_output=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "peak_alloc_kb": 0.0,
+        "payload_bytes": 0,
+    }
+
+
+def import_time_report(module: str, top: int = 8) -> List[Tuple[str, float]]:
+    """
+    Run ``python -X importtime`` for ``module`` and summarize it.
+
+    Returns:
+        (top-level package, cumulative import ms) for the ``top`` slowest packages; a package
+        imported by another one is listed too (e.g. numpy under pandas)
+    """
+    completed = subprocess.run(
+        _import_command(module, "-X", "importtime"), cwd=PROJECT_ROOT, check=True, capture_output=True, text=True
+    )
+    packages: Dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        root = name.strip()
+        if "." not in root and not root.startswith("_"):
+            packages[root] = max(packages.get(root, 0.0), int(cumulative) / 1000)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def run_startup(repeat: int) -> Dict[str, Dict]:
+    """Measure interpreter startup to each of ``STARTUP_MODULES`` and print the heaviest imports."""
+    results = {}
+    for module in STARTUP_MODULES:
+        results[f"import {module}"] = measure_startup(module, repeat)
+        print(f"  import {module:<30} p50 {results[f'import {module}']['p50_ms']:>10.3f} ms")
+        for package, ms in import_time_report(module):
+            print(f"      {package:<28} {ms:>10.1f} ms")
+    return results
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare results with a stored baseline.
+
+    Returns:
+        human-readable regression messages (empty when nothing regressed)
+    """
+    regressions = []
+    for scale, cases in results.items():
+        for name, metrics in cases.items():
+            previous = baseline.get(scale, {}).get(name)
+            if not previous:
+                continue
+            for metric in ("p50_ms", "peak_alloc_kb", "payload_bytes"):
+                limit = previous[metric] * (1 + tolerance)
+                if metrics[metric] > limit and metrics[metric] - previous[metric] > 1:
+                    regressions.append(
+                        f"{scale + ' tickers' if scale.isdigit() else scale} / {name}: "
+                        f"{metric} {metrics[metric]} > baseline {previous[metric]}"
+                    )
+    return regressions
+
+
+def print_table(results: Dict) -> None:
+    header = f"{'scale':>8}  {'case':<40} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'peak KB':>10} {'bytes':>12}"
+    print(header)
+    print("-" * len(header))
+    for scale, cases in results.items():
+        for name, m in cases.items():
+            print(
+                f"{scale:>8}  {name:<40} {m['p50_ms']:>10.3f} {m['p95_ms']:>10.3f} {m['p99_ms']:>10.3f} "
+                f"{m['peak_alloc_kb']:>10.1f} {m['payload_bytes']:>12}"
+            )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the agent tool layer against fixture data")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="ticker-universe sizes")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per case")
+    parser.add_argument("--fixtures", type=Path, help="recorded fixture directory to use instead of synthetic data")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON to this file")
+    parser.add_argument("--skip-startup", action="store_true", help="skip the interpreter startup/import timings")
+    parser.add_argument("--replay", action="store_true", help="serve the fixtures through the HTTP replay server")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="replay server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="replay server random extra latency")
+    parser.add_argument("--rate", type=float, help="replay server requests per second before throttling")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of replay requests failing with 503")
+    args = parser.parse_args(argv)
+    replay = None
+    if args.replay:
+        replay = {
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "rate": args.rate,
+            "error_rate": args.error_rate,
+        }
+
+    results = {}
+    if not args.skip_startup:
+        print("Benchmarking startup imports...")
+        results["startup"] = run_startup(args.repeat)
+
+    for scale in args.scales:
+        print(f"Benchmarking {scale} tickers...")
+        with tempfile.TemporaryDirectory(prefix=f"gpt20-bench-{scale}-") as tmp:
+            results[str(scale)] = run_scale(scale, Path(tmp), args.repeat, args.fixtures, replay)
+
+    print()
+    print_table(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    regressions = compare_with_baseline(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+
+    print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
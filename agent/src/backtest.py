@@ -0,0 +1,260 @@
+"""
+Historical backtest of an index across every version of its Markdown file in git.
+
+Each committed version of ``agent/md/indices/<INDEX>.md`` becomes a rebalance point
+effective from the first session on or after its commit date. Between rebalances the
+holdings are bought and held, so weights drift with prices. The whole simulation runs
+as a handful of NumPy array operations over the cached daily closes.
+
+Usage (from the project root):
+    python -m agent.src.backtest                      # GPT20 vs ^GSPC, written to agent/data/backtest/
+    python -m agent.src.backtest --index GPT20 --output docs/backtest.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import BACKTEST_DIR, BENCHMARK_TICKER, INDEX_NAME, TRADING_DAYS_PER_YEAR
+from .tools.financial_data import load_closes
+from .tools.index_store import parse_holdings
+from .tools.providers import get_provider, period_start
+from .tools.templates import _get_index_path
+
+# Shortest history period that covers the first rebalance is loaded from the bar store
+_PERIODS = ["1y", "2y", "5y", "10y", "max"]
+
+
+def index_versions(index_path: Path) -> List[Dict]:
+    """
+    Read every committed version of an index file with two git processes.
+
+    Returns:
+        versions oldest first, each with commit, date (commit timestamp) and parsed holdings;
+        versions without any holdings (e.g. a placeholder file) are skipped
+    """
+    log = subprocess.run(
+        ["git", "log", "--format=%H %ct", "--", index_path.name],
+        cwd=index_path.parent,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    commits = [line.split() for line in reversed(log.stdout.splitlines()) if line.strip()]
+    if not commits:
+        return []
+
+    # One cat-file process streams every blob instead of a `git show` per version
+    requests = "".join(f"{commit}:./{index_path.name}\n" for commit, _ in commits)
+    batch = subprocess.run(
+        ["git", "cat-file", "--batch"], cwd=index_path.parent, input=requests.encode(), check=True, capture_output=True
+    )
+
+    versions = []
+    output, offset = batch.stdout, 0
+    for commit, timestamp in commits:
+        newline = output.index(b"\n", offset)
+        header = output[offset:newline].split()
+        offset = newline + 1
+        if header[-1] == b"missing":
+            # Deleted in this commit
+            continue
+        size = int(header[2])
+        content = output[offset : offset + size].decode("utf-8", errors="replace")
+        offset += size + 1
+
+        holdings = parse_holdings(content)
+        if holdings:
+            versions.append(
+                {
+                    "commit": commit,
+                    "date": pd.Timestamp(int(timestamp), unit="s"),
+                    "holdings": {holding["ticker"]: holding["weight"] for holding in holdings},
+                }
+            )
+    return versions
+
+
+def weight_timeline(versions: List[Dict]) -> Tuple[pd.DatetimeIndex, List[str], np.ndarray]:
+    """
+    Turn index versions into a dense weight matrix.
+
+    Several versions committed on the same day collapse into the last one.
+
+    Returns:
+        (effective dates, tickers ever held, weights as fractions with one row per date)
+    """
+    by_day: Dict[pd.Timestamp, Dict[str, float]] = {}
+    for version in versions:
+        by_day[version["date"].normalize()] = version["holdings"]
+
+    tickers = sorted({ticker for holdings in by_day.values() for ticker in holdings})
+    column = {ticker: i for i, ticker in enumerate(tickers)}
+    weights = np.zeros((len(by_day), len(tickers)))
+    for row, holdings in enumerate(by_day.values()):
+        for ticker, weight in holdings.items():
+            weights[row, column[ticker]] = weight
+
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    return pd.DatetimeIndex(list(by_day)), tickers, weights
+
+
+def simulate(prices: np.ndarray, rebalance_rows: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Simulate a buy-and-hold portfolio that is reset to target weights at each rebalance row.
+
+    Args:
+        prices: Daily closes, one row per session and one column per ticker (NaN where unknown)
+        rebalance_rows: Increasing session rows where each weight row takes effect; the first must be 0
+        weights: Target weights (fractions) with one row per rebalance
+
+    Returns:
+        portfolio value per session, starting at 1.0
+    """
+    prices = pd.DataFrame(prices).ffill().to_numpy()
+    anchors = prices[rebalance_rows]
+
+    # Holdings without a price at the rebalance are dropped and the rest scaled up;
+    # a rebalance with no priced holding at all sits in cash until the next one
+    weights = np.where(np.isfinite(anchors) & (anchors > 0), weights, 0.0)
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+    cash = totals[:, 0] <= 0
+    held = np.where(weights > 0, anchors, 1.0)
+
+    def growth(rows: np.ndarray, segments: np.ndarray) -> np.ndarray:
+        relative = np.where(weights[segments] > 0, prices[rows] / held[segments], 0.0)
+        return np.where(cash[segments], 1.0, np.einsum("ij,ij->i", weights[segments], relative))
+
+    # Value at each rebalance = value at the previous one times that segment's growth up to it
+    starts = np.concatenate([[1.0], np.cumprod(growth(rebalance_rows[1:], np.arange(len(rebalance_rows) - 1)))])
+
+    rows = np.arange(len(prices))
+    segments = np.searchsorted(rebalance_rows, rows, side="right") - 1
+    return starts[segments] * growth(rows, segments)
+
+
+def _stats(values: np.ndarray) -> Dict:
+    returns = values[1:] / values[:-1] - 1
+    years = max(len(returns), 1) / TRADING_DAYS_PER_YEAR
+    drawdown = values / np.maximum.accumulate(values) - 1
+    volatility = None
+    if len(returns) > 1:
+        volatility = round(float(np.std(returns, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) * 100, 2)
+    return {
+        "return_pct": round(float(values[-1] / values[0] - 1) * 100, 2),
+        "annualized_return_pct": round(float((values[-1] / values[0]) ** (1 / years) - 1) * 100, 2),
+        "volatility_pct": volatility,
+        "max_drawdown_pct": round(float(drawdown.min()) * 100, 2),
+    }
+
+
+def covering_period(start: pd.Timestamp) -> str:
+    """Return the shortest bar-store period whose history reaches back to ``start``."""
+    today = get_provider().today()
+    for period in _PERIODS:
+        covered_from = period_start(period, today)
+        if covered_from is None or covered_from <= start:
+            return period
+    return "max"
+
+
+def run_backtest(
+    index_name: str = INDEX_NAME, benchmark: str = BENCHMARK_TICKER, versions: Optional[List[Dict]] = None
+) -> Dict:
+    """
+    Backtest every committed version of an index against a benchmark.
+
+    Args:
+        index_name: Index file under agent/md/indices (e.g., "GPT20")
+        benchmark: Benchmark ticker (e.g., "^GSPC")
+        versions: Index versions to use instead of reading git history (see index_versions)
+
+    Returns:
+        dict with the session dates, index and benchmark series (both starting at 100),
+        the rebalances applied, summary statistics and tickers without price data
+    """
+    if versions is None:
+        versions = index_versions(_get_index_path(index_name))
+    if not versions:
+        raise ValueError(f"No committed versions of index '{index_name}' with holdings")
+
+    dates, tickers, weights = weight_timeline(versions)
+    first = versions[0]["date"].normalize()  # dates[0]: versions are oldest first
+    closes = load_closes(tickers + [benchmark], covering_period(first)).truncate(before=first)
+    if closes.empty:
+        raise ValueError("No price history after the first index version")
+
+    sessions = pd.DatetimeIndex(closes.index)
+    prices = closes.reindex(columns=tickers).to_numpy(dtype="float64")
+    rows = sessions.searchsorted(dates, side="left")
+
+    # Versions landing on the same session (e.g. over a weekend) keep the last; later ones never take effect
+    keep = np.append(rows[1:] != rows[:-1], True) & (rows < len(sessions))
+    rows, weights, dates = rows[keep], weights[keep], dates[keep]
+    sessions, prices = pd.DatetimeIndex(sessions[rows[0] :]), prices[rows[0] :]
+    rows = rows - rows[0]
+
+    nav = simulate(prices, rows, weights) * 100
+    series = {"index": nav}
+    if benchmark in closes.columns:
+        bench = closes[benchmark].reindex(sessions).ffill().bfill().to_numpy(dtype="float64")
+        series["benchmark"] = bench / bench[0] * 100
+
+    stats = {name: _stats(values) for name, values in series.items()}
+    if "benchmark" in stats:
+        stats["excess_return_pct"] = round(stats["index"]["return_pct"] - stats["benchmark"]["return_pct"], 2)
+
+    priced = set(closes.columns)
+    days = sessions.strftime("%Y-%m-%d").tolist()
+    return {
+        "index": index_name,
+        "benchmark": benchmark,
+        "start": days[0],
+        "end": days[-1],
+        "dates": days,
+        "series": {name: np.round(values, 4).tolist() for name, values in series.items()},
+        "rebalances": [
+            {"date": days[row], "holdings": int(np.count_nonzero(weights[i]))} for i, row in enumerate(rows)
+        ],
+        "stats": stats,
+        "missing_tickers": [ticker for ticker in tickers if ticker not in priced],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backtest an index over the git history of its Markdown file")
+    parser.add_argument("--index", default=INDEX_NAME, help="index file name (default: %(default)s)")
+    parser.add_argument("--benchmark", default=BENCHMARK_TICKER, help="benchmark ticker (default: %(default)s)")
+    parser.add_argument("--output", type=Path, help="JSON output path (default: agent/data/backtest/<INDEX>.json)")
+    args = parser.parse_args(argv)
+
+    try:
+        result = run_backtest(args.index, args.benchmark)
+    except (ValueError, subprocess.CalledProcessError) as e:
+        print(f"❌ Backtest failed: {e}")
+        return 1
+
+    output = args.output or BACKTEST_DIR / f"{args.index}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, separators=(",", ":")), encoding="utf-8")
+
+    stats = result["stats"]
+    print(f"{result['index']} {result['start']} → {result['end']}: {len(result['rebalances'])} rebalances")
+    for name in result["series"]:
+        print(f"  {name:<10} {stats[name]['return_pct']:>8.2f}%  max drawdown {stats[name]['max_drawdown_pct']:.2f}%")
+    if result["missing_tickers"]:
+        print(f"  No price data for: {', '.join(result['missing_tickers'])}")
+    print(f"Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Non-interactive batch runner for index updates.
+
+Each index is written to agent/md/indices/<NAME>.md and its prompts are filled with
+its name. Indices that share a portfolio run one at a time, and portfolio-db holds a
+single portfolio, so a batch takes one index until it can hold one per index.
+
+Usage (from the project root):
+    python -m agent.src.batch                                # the index in BATCH_INDICES
+    python -m agent.src.batch --index GPT20=SYSTEM:UPDATE
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .cli import generate_markdown_from_database, test_portfolio_db_connection
+from .config import (
+    BATCH_DONE_MSG,
+    BATCH_INDICES,
+    BATCH_SHARED_PORTFOLIO_MSG,
+    BATCH_START_MSG,
+    BATCH_WORKERS,
+    CONNECTING_MCP_MSG,
+    MCP_ERROR_MSG,
+    MCP_HELP_MSG,
+    MCP_SUCCESS_MSG,
+    MIGRATION_PROMPT,
+    TRACE_DIR,
+)
+from .main import create_agent
+from .portfolio_db import connect_portfolio_db
+from .tools.cache import cache_stats
+from .tools.scheduler import format_scheduler_stats, scheduler_stats
+from .tools.templates import format_template, warm_templates
+from .tracing import RunTracer
+
+
+def run_index(index_name: str, system_prompt_name: str, user_prompt_name: Optional[str], portfolio_tools: List) -> Dict:
+    """
+    Run one index update to completion without printing the model stream.
+
+    Returns:
+        dict with the index name, status, wall time, call counts and error (if any)
+    """
+    started = time.perf_counter()
+    trace_path = TRACE_DIR / f"batch-{datetime.now():%Y%m%d-%H%M%S}-{index_name}.jsonl"
+    tracer = RunTracer(mcp_tool_names=[tool.tool_name for tool in portfolio_tools], trace_path=trace_path)
+    result = {"index": index_name, "system_prompt": system_prompt_name, "success": False, "error": None}
+
+    try:
+        agent = create_agent(
+            system_prompt_name, portfolio_tools, hooks=[tracer], index_name=index_name, callback_handler=None
+        )
+        if user_prompt_name:
+            agent(format_template(user_prompt_name, index_name=index_name))
+        else:
+            agent(MIGRATION_PROMPT.format(index_name))
+        result["success"] = True
+    except Exception as e:
+        result["error"] = str(e)
+
+    rows = tracer.summary()
+    result.update(
+        {
+            "seconds": round(time.perf_counter() - started, 2),
+            "model_calls": sum(row["calls"] for row in rows if row["kind"] == "model"),
+            "tool_calls": sum(row["calls"] for row in rows if row["kind"] == "tool"),
+            "tool_errors": sum(row["errors"] for row in rows if row["kind"] == "tool"),
+            "trace": str(trace_path),
+        }
+    )
+    return result
+
+
+def run_batch(
+    indices: Dict[str, Tuple[str, Optional[str]]], workers: int = BATCH_WORKERS, generate_markdown: bool = True
+) -> List[Dict]:
+    """
+    Run index updates against one portfolio-db MCP session.
+
+    The runs are threads in this process rather than separate processes: they
+    spend their time waiting on the model and data APIs, and sharing the
+    process lets them share the market data cache, the on-disk bar store and
+    the single MCP connection. Indices that share a portfolio must not run at
+    the same time, and portfolio-db holds a single portfolio, so more than one
+    index is refused with a ValueError.
+
+    Args:
+        indices: Index name -> (system prompt name, user prompt name or None for migration)
+        workers: Maximum number of concurrent index updates
+        generate_markdown: Regenerate each successfully updated index file from the database
+
+    Returns:
+        per-index results in the order given, or an empty list if portfolio-db is unreachable
+    """
+    if len(indices) > 1:
+        raise ValueError(BATCH_SHARED_PORTFOLIO_MSG.format(", ".join(indices)))
+    if not test_portfolio_db_connection():
+        return []
+
+    print(CONNECTING_MCP_MSG)
+    try:
+        with connect_portfolio_db() as mcp_client:
+            portfolio_tools = mcp_client.list_tools_sync()
+            print(MCP_SUCCESS_MSG.format(len(portfolio_tools)))
+            print(BATCH_START_MSG.format(len(indices), workers))
+
+            def run(name: str) -> Dict:
+                result = run_index(name, *indices[name], portfolio_tools)
+                print(BATCH_DONE_MSG.format("✅" if result["success"] else "❌", name, result["seconds"]))
+                return result
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run, indices))
+
+            if generate_markdown:
+                for result in results:
+                    if result["success"]:
+                        generate_markdown_from_database(mcp_client, result["index"])
+            return results
+    except Exception as e:
+        print(MCP_ERROR_MSG.format(e))
+        print(MCP_HELP_MSG)
+        return []
+
+
+def print_results(results: List[Dict]) -> None:
+    """Print a per-index table of outcomes and timings."""
+    header = f"{'index':<16} {'status':<7} {'seconds':>8} {'model':>6} {'tools':>6} {'errs':>5}"
+    print(f"\n{header}")
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['index']:<16} {'ok' if result['success'] else 'failed':<7} {result['seconds']:>8.1f} "
+            f"{result['model_calls']:>6} {result['tool_calls']:>6} {result['tool_errors']:>5}"
+        )
+        if result["error"]:
+            print(f"  {result['error']}")
+
+    stats = cache_stats()
+    print(f"Market data cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+    print(f"Upstream requests: {format_scheduler_stats(scheduler_stats())}")
+
+
+def _parse_index(value: str) -> Tuple[str, Tuple[str, Optional[str]]]:
+    # NAME uses the BATCH_INDICES entry (or SYSTEM:UPDATE); NAME=SYSTEM:USER picks the prompts explicitly
+    name, _, prompts = value.partition("=")
+    if not prompts:
+        return name, BATCH_INDICES.get(name, ("SYSTEM", "UPDATE"))
+    system_prompt_name, _, user_prompt_name = prompts.partition(":")
+    return name, (system_prompt_name, user_prompt_name or None)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run several index updates concurrently")
+    parser.add_argument(
+        "--index",
+        action="append",
+        type=_parse_index,
+        help="NAME or NAME=SYSTEM_PROMPT[:USER_PROMPT] (default: the index in BATCH_INDICES)",
+    )
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="concurrent index updates")
+    parser.add_argument("--no-markdown", action="store_true", help="skip regenerating the index file afterwards")
+    args = parser.parse_args(argv)
+
+    indices: Dict[str, Tuple[str, Optional[str]]] = dict(args.index) if args.index else dict(BATCH_INDICES)
+    if len(indices) > 1:
+        parser.error(BATCH_SHARED_PORTFOLIO_MSG.format(", ".join(indices)))
+
+    # Compile every prompt up front so a misspelled prompt fails before any run starts
+    available = set(warm_templates())
+    for name, prompts in indices.items():
+        unknown = [prompt for prompt in prompts if prompt and prompt not in available]
+        if unknown:
+            parser.error(f"unknown prompt template(s) for {name}: {', '.join(unknown)}")
+    results = run_batch(indices, args.workers, generate_markdown=not args.no_markdown)
+    if not results:
+        return 1
+
+    print_results(results)
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
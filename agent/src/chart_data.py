@@ -0,0 +1,351 @@
+"""
+Precomputed chart data for the GitHub Pages site, appended to day by day.
+
+``docs/chart-data.json`` holds the index NAV, the benchmark and each holding's
+cumulative contribution to the NAV as delta-encoded integers, so the page loads
+a few KB and only has to take running sums before drawing. The simulation state
+after the last session (units held, cost basis, realized contributions, last
+prices) is kept in ``docs/.chart-state.json``; each update fetches closes only
+from that session on and appends the new days. Any history the state does not
+describe (a rewritten or backdated index commit, a missing artifact, or closes
+re-adjusted for a split or dividend since the last update) triggers a full
+rebuild with the same code path.
+
+Usage (from the project root):
+    python -m agent.src.chart_data            # update docs/chart-data.json
+    python -m agent.src.chart_data --rebuild  # recompute from the first index version
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, cast
+
+import numpy as np
+import pandas as pd
+
+from .backtest import covering_period, index_versions
+from .config import (
+    BENCHMARK_TICKER,
+    CHART_DATA_PATH,
+    CHART_SCALE,
+    CHART_STATE_NAME,
+    INDEX_NAME,
+    PRICE_ADJUSTMENT_TOLERANCE,
+)
+from .tools.atomic import atomic_write
+from .tools.financial_data import load_closes
+from .tools.providers import get_provider
+from .tools.templates import _get_index_path
+
+CHART_VERSION = 1
+
+
+def delta_encode(values: np.ndarray, previous: int = 0) -> List[int]:
+    """Quantize ``values`` to 1/CHART_SCALE and encode each as the difference from the one before."""
+    quantized = np.round(np.asarray(values, dtype="float64") * CHART_SCALE).astype(np.int64)
+    return np.diff(quantized, prepend=previous).tolist()
+
+
+def delta_decode(deltas: List[int]) -> np.ndarray:
+    """Inverse of ``delta_encode`` (starting from 0)."""
+    return np.cumsum(np.asarray(deltas, dtype=np.int64)) / CHART_SCALE
+
+
+def _new_state(index_name: str, benchmark: str) -> Dict:
+    return {
+        "version": CHART_VERSION,
+        "index": index_name,
+        "benchmark": benchmark,
+        "applied_versions": 0,
+        "last_commit": None,
+        "last_date": None,
+        "sessions": 0,
+        "cash": 100.0,
+        "units": {},
+        "cost": {},
+        "realized": {},
+        "last_prices": {},
+        "benchmark_units": None,
+    }
+
+
+def _pending_rebalances(versions: List[Dict], sessions: pd.DatetimeIndex) -> List[Tuple[int, int, Dict]]:
+    """Map versions onto session rows as (row, version count applied, holdings); the last version per session wins."""
+    rebalances: List[Tuple[int, int, Dict]] = []
+    for position, version in enumerate(versions):
+        row = int(np.searchsorted(sessions.values, version["date"].normalize().to_datetime64(), side="left"))
+        if row >= len(sessions):
+            # No session yet on or after this commit; it takes effect on a later update
+            break
+        if rebalances and rebalances[-1][0] == row:
+            rebalances.pop()
+        rebalances.append((row, position + 1, version["holdings"]))
+    return rebalances
+
+
+def advance(state: Dict, versions: List[Dict], closes: pd.DataFrame) -> Dict:
+    """
+    Advance the simulation state over new sessions, rebalancing at the pending index versions.
+
+    Between rebalances the units bought at the last rebalance are held, so the NAV is
+    ``cash + units @ prices`` and a holding's cumulative contribution is what it realized
+    in earlier holding periods plus ``units * price - cost`` in the current one. The
+    contributions always sum to ``NAV - 100``.
+
+    Args:
+        state: Simulation state (see ``_new_state``); updated in place
+        versions: Index versions not yet applied, oldest first, all dated after ``state["last_date"]``
+        closes: Daily closes for the new sessions, one column per ticker (benchmark included)
+
+    Returns:
+        dict with the new sessions, NAV and benchmark arrays, contributions by ticker,
+        and the dates of the rebalances applied
+    """
+    benchmark = state["benchmark"]
+    sessions = pd.DatetimeIndex(closes.index)
+    rebalances = _pending_rebalances(versions, sessions)
+    if state["last_date"] is None:
+        if not rebalances:
+            return {"sessions": sessions[:0], "nav": [], "benchmark": [], "contributions": {}, "rebalances": []}
+        # A fresh simulation starts at the first rebalance
+        first = rebalances[0][0]
+        sessions, closes = sessions[first:], closes.iloc[first:]
+        rebalances = [(row - first, applied, holdings) for row, applied, holdings in rebalances]
+
+    tickers = sorted(
+        set(state["realized"]) | set(state["units"]) | {ticker for _, _, holdings in rebalances for ticker in holdings}
+    )
+    prices = closes.reindex(columns=tickers).ffill().fillna(state["last_prices"]).to_numpy(dtype="float64")
+    units = np.array([state["units"].get(ticker, 0.0) for ticker in tickers])
+    cost = np.array([state["cost"].get(ticker, 0.0) for ticker in tickers])
+    realized = np.array([state["realized"].get(ticker, 0.0) for ticker in tickers])
+    cash = state["cash"]
+    applied_before = state["applied_versions"]
+
+    nav = np.empty(len(sessions))
+    contributions = np.empty((len(sessions), len(tickers)))
+    bounds = [row for row, _, _ in rebalances] + [len(sessions)]
+    periods: List[Optional[Tuple[int, int, Dict]]] = list(rebalances)
+    if bounds[0] > 0:
+        bounds.insert(0, 0)
+        periods.insert(0, None)
+
+    for rebalance, start, end in zip(periods, bounds[:-1], bounds[1:]):
+        if rebalance is not None:
+            _, applied, holdings = rebalance
+            state["applied_versions"] = applied_before + applied
+            state["last_commit"] = versions[applied - 1]["commit"]
+            anchor = prices[start]
+            # Close the previous holding period at this session's prices, then buy the new weights
+            realized += np.where(units > 0, units * anchor - cost, 0.0)
+            value = cash + np.nansum(np.where(units > 0, units * anchor, 0.0))
+            target = np.array([holdings.get(ticker, 0.0) for ticker in tickers])
+            target = np.where(np.isfinite(anchor) & (anchor > 0), target, 0.0)
+            if target.sum() > 0:
+                cost = value * target / target.sum()
+                units = np.divide(cost, anchor, out=np.zeros_like(cost), where=target > 0)
+                cash = 0.0
+            else:
+                units, cost, cash = np.zeros(len(tickers)), np.zeros(len(tickers)), value
+
+        block = prices[start:end]
+        held = np.where(units > 0, units * block, 0.0)
+        nav[start:end] = cash + held.sum(axis=1)
+        contributions[start:end] = realized + np.where(units > 0, held - cost, 0.0)
+
+    benchmark_prices = closes[benchmark].ffill() if benchmark in closes.columns else pd.Series(np.nan, sessions)
+    benchmark_prices = benchmark_prices.fillna(state["last_prices"].get(benchmark, np.nan)).to_numpy("float64")
+    if state["benchmark_units"] is None and len(sessions):
+        if not np.isfinite(benchmark_prices[0]):
+            raise ValueError(f"No {benchmark} close on {sessions[0]:%Y-%m-%d}")
+        state["benchmark_units"] = 100.0 / benchmark_prices[0]
+
+    if len(sessions):
+        last = prices[-1]
+        state.update(
+            {
+                "last_date": f"{sessions[-1]:%Y-%m-%d}",
+                "sessions": state["sessions"] + len(sessions),
+                "cash": float(cash),
+                "units": {t: float(u) for t, u in zip(tickers, units) if u > 0},
+                "cost": {t: float(c) for t, c in zip(tickers, cost) if c > 0},
+                "realized": {t: float(r) for t, r in zip(tickers, realized)},
+                "last_prices": {
+                    **{t: float(p) for t, p in zip(tickers, last) if np.isfinite(p)},
+                    benchmark: float(benchmark_prices[-1]),
+                },
+            }
+        )
+    return {
+        "sessions": sessions,
+        "nav": nav,
+        "benchmark": benchmark_prices * (state["benchmark_units"] or 0.0),
+        "contributions": {ticker: contributions[:, i] for i, ticker in enumerate(tickers)},
+        "rebalances": [f"{sessions[start]:%Y-%m-%d}" for rebalance, start in zip(rebalances, bounds) if rebalance],
+    }
+
+
+def _append(chart: Dict, step: Dict, previous_date: Optional[str]) -> None:
+    sessions = step["sessions"]
+    if not len(sessions):
+        return
+    if previous_date is None:
+        chart["start"] = sessions[0].strftime("%Y-%m-%d")
+        previous_date = chart["start"]
+    # Calendar days since the previous session, so dates cost a digit each
+    ordinals = sessions.values.astype("datetime64[D]").astype(np.int64)
+    chart["days"].extend(np.diff(ordinals, prepend=np.datetime64(previous_date, "D").astype(np.int64)).tolist())
+
+    for name, encoded in chart["series"].items():
+        encoded.extend(delta_encode(step[name], sum(encoded)))
+    padding = len(chart["days"]) - len(sessions)
+    for ticker, values in step["contributions"].items():
+        # Holdings new to the index contributed nothing before they were bought
+        existing = chart["contributions"].setdefault(ticker, [0] * padding)
+        existing.extend(delta_encode(values, sum(existing)))
+    chart["rebalances"].extend(step["rebalances"])
+    chart["end"] = sessions[-1].strftime("%Y-%m-%d")
+
+
+def _load(path: Path) -> Optional[Dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: Path, payload: Dict, **kwargs) -> None:
+    with atomic_write(path) as f:
+        json.dump(payload, f, **kwargs)
+
+
+def _resumable(state: Optional[Dict], chart: Optional[Dict], versions: List[Dict], index_name: str, benchmark: str):
+    if not state or not chart or state.get("version") != CHART_VERSION:
+        return False
+    if (state["index"], state["benchmark"]) != (index_name, benchmark) or len(chart["days"]) != state["sessions"]:
+        return False
+    applied = state["applied_versions"]
+    if applied > len(versions) or (applied and versions[applied - 1]["commit"] != state["last_commit"]):
+        return False
+    # Versions not applied yet must take effect after the last session already in the chart
+    last_date = pd.Timestamp(state["last_date"])
+    return all(version["date"].normalize() > last_date for version in versions[applied:])
+
+
+def _fetch_closes(state: Dict, versions: List[Dict], benchmark: str, start: pd.Timestamp) -> pd.DataFrame:
+    """Closes from ``start`` up to yesterday for the holdings and pending versions of ``state``."""
+    pending = versions[state["applied_versions"] :]
+    tickers = sorted(set(state["units"]) | {ticker for version in pending for ticker in version["holdings"]})
+    closes = load_closes(tickers + [benchmark], covering_period(start))
+    today = pd.Timestamp(get_provider().today())
+    return closes.loc[(closes.index >= start) & (closes.index < today)]
+
+
+def _last_prices_match(state: Dict, closes: pd.DataFrame, benchmark: str) -> bool:
+    """Whether the refetched closes of the last session agree with the prices the state was saved with."""
+    last_date = pd.Timestamp(state["last_date"])
+    if last_date not in closes.index:
+        return False
+    for ticker in set(state["units"]) | {benchmark}:
+        saved = state["last_prices"].get(ticker)
+        fresh = closes.at[last_date, ticker] if ticker in closes.columns else np.nan
+        # Prices carried forward over gaps in the data have nothing to compare against
+        if saved is not None and np.isfinite(fresh) and not np.isclose(fresh, saved, rtol=PRICE_ADJUSTMENT_TOLERANCE):
+            return False
+    return True
+
+
+def update_chart_data(
+    index_name: str = INDEX_NAME,
+    benchmark: str = BENCHMARK_TICKER,
+    output: Path = CHART_DATA_PATH,
+    rebuild: bool = False,
+    versions: Optional[List[Dict]] = None,
+) -> Dict:
+    """
+    Bring the chart data artifact up to date with the index history and the latest closes.
+
+    Sessions dated today are left for the next update, since their close may still move.
+
+    Args:
+        index_name: Index file under agent/md/indices (e.g., "GPT20")
+        benchmark: Benchmark ticker (e.g., "^GSPC")
+        output: Chart data JSON path; the state file is written next to it
+        rebuild: Recompute from the first index version even if the state could be resumed
+        versions: Index versions to use instead of reading git history (see backtest.index_versions)
+
+    Returns:
+        dict with ``written``, whether the chart was ``rebuilt``, the number of ``appended`` sessions and ``sessions``
+    """
+    output = Path(output)
+    state_path = output.parent / CHART_STATE_NAME
+    if versions is None:
+        versions = index_versions(_get_index_path(index_name))
+    if not versions:
+        raise ValueError(f"No committed versions of index '{index_name}' with holdings")
+
+    state, chart = _load(state_path), _load(output)
+    closes: Optional[pd.DataFrame] = None
+    if not rebuild and state and chart and _resumable(state, chart, versions, index_name, benchmark):
+        # Refetch the last session too: closes are split- and dividend-adjusted, so a corporate
+        # action since the last update changes it, and the saved units would no longer apply
+        last_date = cast(pd.Timestamp, pd.Timestamp(state["last_date"]))
+        refetched = _fetch_closes(state, versions, benchmark, last_date)
+        if _last_prices_match(state, refetched, benchmark):
+            closes = refetched.loc[refetched.index > last_date]
+
+    rebuilt = closes is None
+    if not state or not chart or closes is None:
+        state = _new_state(index_name, benchmark)
+        chart = {
+            "version": CHART_VERSION,
+            "index": index_name,
+            "benchmark": benchmark,
+            "scale": CHART_SCALE,
+            "start": None,
+            "end": None,
+            "days": [],
+            "series": {"nav": [], "benchmark": []},
+            "contributions": {},
+            "rebalances": [],
+        }
+        closes = _fetch_closes(state, versions, benchmark, versions[0]["date"].normalize())
+
+    previous_date = state["last_date"]
+    step = advance(state, versions[state["applied_versions"] :], closes)
+    if not rebuilt and not len(step["sessions"]):
+        return {"written": False, "rebuilt": False, "appended": 0, "sessions": state["sessions"]}
+
+    _append(chart, step, previous_date)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    _write_json(output, chart, separators=(",", ":"))
+    _write_json(state_path, state, indent=1)
+    return {"written": True, "rebuilt": rebuilt, "appended": len(step["sessions"]), "sessions": state["sessions"]}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Update the precomputed chart data for the Pages site")
+    parser.add_argument("--index", default=INDEX_NAME, help="index file name (default: %(default)s)")
+    parser.add_argument("--benchmark", default=BENCHMARK_TICKER, help="benchmark ticker (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=CHART_DATA_PATH, help="chart data JSON path")
+    parser.add_argument("--rebuild", action="store_true", help="recompute from the first index version")
+    args = parser.parse_args(argv)
+
+    try:
+        result = update_chart_data(args.index, args.benchmark, args.output, args.rebuild)
+    except ValueError as e:
+        print(f"❌ Chart data update failed: {e}")
+        return 1
+
+    if not result["written"]:
+        print(f"Chart data already up to date ({result['sessions']} sessions)")
+    else:
+        action = "Rebuilt" if result["rebuilt"] else "Appended"
+        print(f"{action} chart data: {result['appended']} new sessions, {result['sessions']} total → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,8 @@
-import subprocess
-import requests
 from typing import Optional, Tuple
 
+from .portfolio_db import health_check
 from .config import (
+    PORTFOLIO_DB_URL,
     PROMPT_MENU,
     PROMPT_INPUT,
     USING_MIGRATION_MSG,
@@ -13,9 +13,10 @@ from .config import (
     CONNECTION_HELP_MSG,
     GENERATING_MD_MSG,
     MD_SUCCESS_MSG,
-    MD_ERROR_MSG,
-    MD_TIMEOUT_MSG,
+    MD_OUTPUT_MSG,
+    MD_UNCHANGED_MSG,
     MD_FAILED_MSG,
+    INDEX_NAME,
 )
 
 
@@ -49,41 +50,36 @@ def test_portfolio_db_connection() -> bool:
     Returns:
         True if connection successful, False otherwise
     """
+    import requests
+
     print(TESTING_CONNECTION_MSG)
     try:
-        response = requests.get("http://localhost:8080/health", timeout=5)
-        response.raise_for_status()
+        health_check()
         print(CONNECTION_SUCCESS_MSG)
         return True
     except requests.exceptions.RequestException as e:
         print(CONNECTION_ERROR_MSG.format(e))
-        print(CONNECTION_HELP_MSG)
+        print(CONNECTION_HELP_MSG.format(PORTFOLIO_DB_URL))
         return False
 
 
-def generate_markdown_from_database() -> None:
+def generate_markdown_from_database(mcp_client, index_name: str = INDEX_NAME) -> None:
     """
-    Generate GPT20.md from the updated database by calling the generate-md script.
+    Regenerate an index file (GPT20.md by default) from the holdings in the portfolio database.
+
+    Args:
+        mcp_client: Connected portfolio-db MCP client
+        index_name: Index file under agent/md/indices to write
     """
-    print(GENERATING_MD_MSG)
-    try:
-        # Path to the portfolio-db service
-        portfolio_db_path = "/home/hunter/Desktop/claude-20/services/portfolio-db"
-        result = subprocess.run(
-            ["./generate-md"],
-            cwd=portfolio_db_path,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+    from .index_markdown import fetch_holdings, write_index_markdown
 
-        if result.returncode == 0:
-            print(MD_SUCCESS_MSG)
-            print(result.stdout.strip())
+    print(GENERATING_MD_MSG.format(index_name))
+    try:
+        result = write_index_markdown(fetch_holdings(mcp_client), index_name)
+        if result["written"]:
+            print(MD_SUCCESS_MSG.format(index_name))
+            print(MD_OUTPUT_MSG.format(result["holdings"], result["path"]))
         else:
-            print(MD_ERROR_MSG.format(result.stderr))
-
-    except subprocess.TimeoutExpired:
-        print(MD_TIMEOUT_MSG)
+            print(MD_UNCHANGED_MSG.format(index_name))
     except Exception as e:
         print(MD_FAILED_MSG.format(e))
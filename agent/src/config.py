@@ -1,14 +1,106 @@
 """Configuration settings for the agent."""
 
 import os
+from pathlib import Path
 
 # Model configuration
 MODEL_ID = "gpt-4o"
 API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Portfolio-db connection (health checks and MCP traffic share pooled keep-alive connections)
+PORTFOLIO_DB_URL = os.environ.get("PORTFOLIO_DB_URL", "http://localhost:8080").rstrip("/")
+PORTFOLIO_DB_TIMEOUT_SECONDS = 30  # Connect/request timeout; MCP streams use PORTFOLIO_DB_READ_TIMEOUT_SECONDS
+PORTFOLIO_DB_READ_TIMEOUT_SECONDS = 5 * 60
+PORTFOLIO_DB_HEALTH_TIMEOUT_SECONDS = 5
+PORTFOLIO_DB_MAX_CONNECTIONS = 10
+PORTFOLIO_DB_RETRIES = 3  # Retries for failed connections and 502/503/504 responses, with exponential backoff
+PORTFOLIO_DB_BACKOFF_SECONDS = 0.5
+
 # Index file configuration
 INDEX_NAME = "GPT20"
 
+# Financial data configuration
+DATA_DIR = Path(__file__).parent.parent / "data"
+# "yfinance", "fixtures", "http" (a replay server) or "record" (yfinance, saved as fixtures)
+MARKET_DATA_PROVIDER = os.environ.get("MARKET_DATA_PROVIDER", "yfinance")
+MARKET_DATA_FIXTURES_DIR = Path(os.environ.get("MARKET_DATA_FIXTURES_DIR", DATA_DIR / "fixtures"))
+MARKET_DATA_URL = os.environ.get("MARKET_DATA_URL", "http://localhost:8090")  # For the "http" provider
+MARKET_DATA_HTTP_TIMEOUT_SECONDS = 10
+MARKET_DATA_HTTP_MAX_CONNECTIONS = 16
+QUOTE_FETCH_WORKERS = 8  # Max concurrent per-ticker info requests in batched quote fetches
+BAR_STORE_DIR = DATA_DIR / "bars"  # One cached OHLCV file per ticker, under a directory per provider
+BAR_REFRESH_SECONDS = 15 * 60  # Age after which cached bars are topped up with newer bars
+BAR_SEED_PERIOD = "1y"  # Minimum window fetched when a ticker is first cached
+PRICE_ADJUSTMENT_TOLERANCE = 1e-4  # Relative change in a refetched close that means history was re-adjusted
+# Upstream request scheduling (yfinance / replay server): token bucket, concurrency cap and retries
+MARKET_DATA_RATE_PER_SECOND = 10.0
+MARKET_DATA_BURST = 20
+MARKET_DATA_MAX_CONCURRENCY = 8
+MARKET_DATA_RETRIES = 4  # Retries for throttled (429) and transient (5xx, connection) failures only
+MARKET_DATA_BACKOFF_SECONDS = 1.0  # Full-jitter exponential backoff base, capped at MARKET_DATA_BACKOFF_MAX_SECONDS
+MARKET_DATA_BACKOFF_MAX_SECONDS = 30.0
+MARKET_DATA_THROTTLE_PAUSE_SECONDS = 5.0  # Pause for every request after a 429 without Retry-After
+BENCHMARK_TICKER = "^GSPC"  # Benchmark for correlation/beta metrics
+TRADING_DAYS_PER_YEAR = 252
+
+# Index construction rules enforced by the rebalancing tool (weights in percent)
+PORTFOLIO_CONSTRAINTS = {
+    "holdings": 20,
+    "min_weight": 2.0,
+    "max_weight": 12.0,
+    "top_n": 5,
+    "top_n_max_weight": 50.0,
+    "sector_max_weight": 40.0,
+}
+
+# Market summary configuration (display name -> ticker)
+MARKET_INDICES = {
+    "S&P 500": "^GSPC",
+    "Dow Jones": "^DJI",
+    "NASDAQ": "^IXIC",
+    "Russell 2000": "^RUT",
+    "VIX": "^VIX",
+}
+MARKET_INDEX_TIMEOUT_SECONDS = 10  # Per-index fetch timeout; slower indices are reported as errors
+
+# In-process memoization of financial data (TTL per data kind, in seconds)
+CACHE_TTL_SECONDS = {
+    "quote": 30,
+    "market_index": 30,
+    "history": 15 * 60,
+    "fundamentals": 6 * 60 * 60,
+    "default": 60,
+}
+CACHE_MAX_ENTRIES = 2048
+CACHE_MAX_BYTES = 128 * 1024 * 1024
+
+# Tool response budgets (keep results small enough for the model context)
+TOOL_RESPONSE_MAX_BYTES = 16 * 1024  # Largest serialized tool result before collections are truncated
+HISTORY_MAX_POINTS = 130  # Histories longer than this are downsampled to weekly, then monthly bars
+INDEX_CONTENT_MAX_CHARS = 32 * 1024  # read_index truncates index documents beyond this
+
+# Run tracing (one JSONL span file per agent run)
+TRACE_DIR = DATA_DIR / "traces"
+
+# Backtests over the git history of an index file (one JSON series per index)
+BACKTEST_DIR = DATA_DIR / "backtest"
+
+# Chart data for the Pages site (delta-encoded series, appended to by the Pages workflow)
+CHART_DATA_PATH = Path(__file__).parent.parent.parent / "docs" / "chart-data.json"
+CHART_STATE_NAME = ".chart-state.json"  # Simulation state next to the chart data; dotfile so Pages does not publish it
+CHART_SCALE = 100  # Values are stored as integer hundredths of a NAV point (NAV starts at 100)
+
+# Streaming runs (python -m agent --stream): local tools queue on their own pool so a cancelled run can drop them
+ASYNC_TOOL_WORKERS = 8
+RUN_DEADLINE_SECONDS = 30 * 60  # Default overall limit for a streaming run; in-flight tool calls are cancelled
+
+# Batch runs (index name -> (system prompt, user prompt); a user prompt of None runs MIGRATION_PROMPT).
+# portfolio-db holds a single portfolio, so a batch runs one index until it can hold one per index.
+BATCH_INDICES = {
+    "GPT20": ("SYSTEM", "UPDATE"),
+}
+BATCH_WORKERS = 4  # Index updates run concurrently in one process
+
 # CLI Messages
 PROMPT_MENU = """Available system prompts:
 1. SYSTEM - Standard GPT20 index management
@@ -20,15 +112,24 @@ USING_SYSTEM_MSG = "Using SYSTEM prompt with UPDATE..."
 TESTING_CONNECTION_MSG = "Testing portfolio-db server connection..."
 CONNECTION_SUCCESS_MSG = "✅ Portfolio-db server is running"
 CONNECTION_ERROR_MSG = "❌ Failed to connect to portfolio-db server: {}"
-CONNECTION_HELP_MSG = """Make sure the portfolio-db server is running on localhost:8080
+CONNECTION_HELP_MSG = """Make sure the portfolio-db server is running on {}
 You can start it with: cd services/portfolio-db && ./start_server.sh"""
 CONNECTING_MCP_MSG = "Connecting to portfolio-db MCP server..."
 MCP_SUCCESS_MSG = "✅ Loaded {} portfolio tools from MCP server"
 MCP_ERROR_MSG = "❌ Failed to connect to MCP server: {}"
 MCP_HELP_MSG = "Make sure the portfolio-db server is running and properly configured for MCP"
-GENERATING_MD_MSG = "\n🚀 Generating GPT20.md from updated database..."
-MD_SUCCESS_MSG = "✅ GPT20.md successfully generated!"
-MD_ERROR_MSG = "❌ Error generating markdown: {}"
-MD_TIMEOUT_MSG = "❌ Timeout: Markdown generation took too long"
+GENERATING_MD_MSG = "\n🚀 Generating {}.md from updated database..."
+MD_SUCCESS_MSG = "✅ {}.md successfully generated!"
+MD_OUTPUT_MSG = "Wrote {} holdings to {}"
+MD_UNCHANGED_MSG = "✅ {}.md is already up to date"
 MD_FAILED_MSG = "❌ Failed to generate markdown: {}"
-MIGRATION_PROMPT = "Begin the migration process by reading the GPT20.md file and migrating the data to the database."
+TOOL_CALL_MSG = "\n🔧 {}"
+RUN_CANCELLED_MSG = "\n⛔ Run cancelled; pending tool calls were dropped"
+RUN_DEADLINE_MSG = "\n⏱️ Run stopped at the {}s deadline; pending tool calls were dropped"
+RUN_INCOMPLETE_MSG = "Run did not complete; skipping GPT20.md generation"
+BATCH_START_MSG = "🚀 Running {} index update(s) with {} worker(s)..."
+BATCH_DONE_MSG = "{} {} finished in {:.1f}s"
+BATCH_SHARED_PORTFOLIO_MSG = (
+    "portfolio-db holds a single portfolio, so {} cannot be updated in one batch; run one index"
+)
+MIGRATION_PROMPT = "Begin the migration process by reading the {}.md file and migrating the data to the database."
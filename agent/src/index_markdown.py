@@ -0,0 +1,125 @@
+"""Render an index file (GPT20.md) from the portfolio-db holdings (the format of services/portfolio-db/cmd/generate-md)."""
+
+import hashlib
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .config import INDEX_NAME
+from .tools.templates import _get_index_path, _write_index
+
+_HEADER = (
+    "# {} - AI-Curated Stock Index\n\n"
+    "*An algorithmically-managed portfolio of 20 high-conviction stocks, "
+    "maintained by GPT-4o with real-time market analysis.*\n\n"
+)
+
+_OVERVIEW = (
+    "## Portfolio Overview\n\n"
+    "This index represents a conviction-weighted portfolio of high-quality stocks with dynamic allocation based on "
+    "opportunity size, risk assessment, and market analysis. Holdings are selected based on fundamental analysis, "
+    "market performance, sector diversification, and growth potential.\n\n"
+    "## Current Holdings\n\n"
+)
+
+_METHODOLOGY = (
+    "---\n\n"
+    "## Methodology\n\n"
+    "This index is maintained through:\n"
+    "- **Fundamental Analysis**: Financial health, competitive advantages, and growth prospects\n"
+    "- **Market Intelligence**: Real-time price data and performance tracking\n"
+    "- **Sector Diversification**: Balanced exposure across technology, healthcare, finance, consumer goods, "
+    "and energy\n"
+    "- **Risk Management**: Dynamic weighting with concentration limits (max 15% per position) to balance "
+    "conviction with diversification\n\n"
+)
+
+# Lines that change on every render; ignored when deciding whether the index changed
+_TIMESTAMP_PREFIXES = ("**Last Updated:**", "*Generated automatically from portfolio database on ")
+
+
+def fetch_holdings(mcp_client) -> List[Dict]:
+    """
+    Fetch the current holdings through the portfolio-db ``get_holdings`` MCP tool.
+
+    Raises RuntimeError if the tool fails or the portfolio has no holdings.
+
+    Returns:
+        holdings as returned by portfolio-db (``Ticker``, ``Name``, ``Weight``, ``Price``, ``Comment``, ...),
+        ordered by weight descending
+    """
+    result = mcp_client.call_tool_sync(f"generate-md-{uuid.uuid4().hex[:8]}", "get_holdings", {})
+    text = "".join(block.get("text", "") for block in result.get("content", []))
+    if result.get("status") == "error":
+        raise RuntimeError(text or "get_holdings failed")
+    holdings = json.loads(text)
+    if not holdings:
+        raise RuntimeError("No holdings found in portfolio database")
+    return holdings
+
+
+def _nullable(value) -> str:
+    # Go's sql.NullString marshals as {"String": ..., "Valid": ...}
+    if isinstance(value, dict):
+        return value.get("String", "") if value.get("Valid") else ""
+    return value or ""
+
+
+def _format_last_updated(now: datetime) -> str:
+    # Go layout "January 2, 2006 at 3:04 PM MST"
+    hour = now.hour % 12 or 12
+    return f"{now:%B} {now.day}, {now.year} at {hour}:{now:%M %p} {now.tzname() or ''}".rstrip()
+
+
+def render_markdown(holdings: List[Dict], now: Optional[datetime] = None, index_name: str = INDEX_NAME) -> str:
+    """Render the index document for ``holdings``, byte-for-byte in the generate-md format."""
+    now = now or datetime.now().astimezone()
+    parts = [_HEADER.format(index_name), f"**Last Updated:** {_format_last_updated(now)}\n\n", _OVERVIEW]
+
+    for i, holding in enumerate(holdings, start=1):
+        parts.append(f"{i}. **{holding['Name']} ({holding['Ticker']})** - {holding['Weight']}% \n")
+        try:
+            price = float(holding.get("Price") or 0)
+        except ValueError:
+            price = 0.0
+        if price > 0:
+            parts.append(f"   *Current Price: ${price:.2f}*\n")
+        comment = _nullable(holding.get("Comment"))
+        if comment:
+            parts.append(f"   \n   {comment}\n")
+        parts.append("\n")
+
+    parts.append(_METHODOLOGY)
+    parts.append(f"*Generated automatically from portfolio database on {now:%Y-%m-%d %H:%M:%S}*\n")
+    return "".join(parts)
+
+
+def content_hash(markdown: str) -> str:
+    """Hash an index document, ignoring its timestamp lines."""
+    digest = hashlib.sha256()
+    for line in markdown.splitlines(keepends=True):
+        if not line.startswith(_TIMESTAMP_PREFIXES):
+            digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_index_markdown(holdings: List[Dict], index_name: str = INDEX_NAME) -> Dict:
+    """
+    Render ``holdings`` and atomically replace the index file if anything but the timestamps changed.
+
+    Raises ValueError for empty ``holdings`` rather than replacing the index with one that has none.
+
+    Returns:
+        dict with the file path, holding count and whether the file was written
+    """
+    if not holdings:
+        raise ValueError("No holdings to write")
+    markdown = render_markdown(holdings, index_name=index_name)
+    index_path = _get_index_path(index_name)
+
+    if index_path.exists() and content_hash(index_path.read_text(encoding="utf-8")) == content_hash(markdown):
+        return {"path": str(index_path), "holdings": len(holdings), "written": False}
+
+    _write_index(index_name, markdown)
+    return {"path": str(index_path), "holdings": len(holdings), "written": True}
@@ -1,21 +1,9 @@
-from strands import Agent
-from strands.models.openai import OpenAIModel
-from strands.tools.mcp import MCPClient
-from mcp.client.streamable_http import streamablehttp_client
-from strands_tools import calculator, current_time
+# Heavy imports (strands, the OpenAI client, MCP, pandas/yfinance via the tools) are deferred
+# until after the prompt menu and the portfolio-db health check, so those appear immediately.
+import argparse
+from typing import List, Optional
 
-from .tools.templates import load_template
 from .config import MODEL_ID, API_KEY
-from .tools import (
-    read_index,
-    write_index,
-    get_index_info,
-    get_stock_info,
-    get_stock_history,
-    get_multiple_stocks_info,
-    compare_stocks_performance,
-    get_market_summary,
-)
 from .cli import (
     select_system_prompt,
     test_portfolio_db_connection,
@@ -26,11 +14,112 @@ from .config import (
     MCP_SUCCESS_MSG,
     MCP_ERROR_MSG,
     MCP_HELP_MSG,
+    INDEX_NAME,
     MIGRATION_PROMPT,
+    RUN_DEADLINE_SECONDS,
+    RUN_INCOMPLETE_MSG,
 )
 
 
-def main():
+def local_tools(async_mode: bool = False) -> List:
+    """
+    Return the tools the agent runs in-process (imported on first use).
+
+    Args:
+        async_mode: Return async variants whose queued calls a cancelled run can drop (for streaming runs)
+    """
+    from strands_tools import calculator, current_time
+
+    from .tools import (
+        read_index,
+        write_index,
+        get_index_info,
+        get_index_holding,
+        query_index_holdings,
+        get_stock_info,
+        get_stock_history,
+        get_multiple_stocks_info,
+        compare_stocks_performance,
+        get_market_summary,
+        analyze_portfolio,
+        rebalance_portfolio,
+    )
+
+    tools = [
+        calculator,
+        current_time,
+        read_index,
+        write_index,
+        get_index_info,
+        get_index_holding,
+        query_index_holdings,
+        get_stock_info,
+        get_stock_history,
+        get_multiple_stocks_info,
+        compare_stocks_performance,
+        get_market_summary,
+        analyze_portfolio,
+        rebalance_portfolio,
+    ]
+    if not async_mode:
+        return tools
+
+    from .tools.async_tools import async_tools
+
+    return async_tools(tools)
+
+
+def create_agent(
+    system_prompt_name: str,
+    portfolio_tools: List,
+    hooks: Optional[List] = None,
+    async_mode: bool = False,
+    index_name: str = INDEX_NAME,
+    **kwargs,
+):
+    """
+    Build an agent with the local tools plus the portfolio-db MCP tools.
+
+    Args:
+        system_prompt_name: Template name of the system prompt
+        portfolio_tools: Tools listed by the portfolio-db MCP client
+        hooks: Extra hook providers (e.g. a RunTracer); registered before the response shaper
+        async_mode: Use the async local tools (see ``local_tools``)
+        index_name: Index the agent manages; fills the prompt's ``$index_name`` placeholders
+        **kwargs: Passed through to ``Agent``
+    """
+    from strands import Agent
+    from strands.models.openai import OpenAIModel
+
+    from .tools.shaping import ToolResponseShaper
+    from .tools.templates import format_template
+
+    mcp_tool_names = [tool.tool_name for tool in portfolio_tools]
+    return Agent(
+        model=OpenAIModel(client_args={"api_key": API_KEY}, model_id=MODEL_ID),
+        system_prompt=format_template(system_prompt_name, index_name=index_name),
+        tools=local_tools(async_mode) + portfolio_tools,
+        # After-tool hooks run in reverse order, so a tracer sees the shaped MCP responses
+        hooks=[*(hooks or []), ToolResponseShaper(mcp_tool_names)],
+        **kwargs,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the GPT20 index agent")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stream output as it is generated and run local tools asynchronously; Ctrl-C cancels the run",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=RUN_DEADLINE_SECONDS,
+        help="overall time limit in seconds for a streaming run (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+
     # Allow user to select system prompt
     system_prompt_name, user_prompt_name = select_system_prompt()
 
@@ -38,54 +127,64 @@ def main():
     if not test_portfolio_db_connection():
         return
 
+    from .portfolio_db import connect_portfolio_db
+    from .tools.templates import format_template, warm_templates
+    from .tracing import RunTracer
+
+    # Compile every prompt template once; later loads are served from memory
+    warm_templates()
+
     # Connect to the MCP server and get portfolio tools
     print(CONNECTING_MCP_MSG)
     try:
-        mcp_client = MCPClient(
-            lambda: streamablehttp_client("http://localhost:8080/mcp")
-        )
+        mcp_client = connect_portfolio_db()
 
         with mcp_client:
             # Get portfolio tools from MCP server
             portfolio_tools = mcp_client.list_tools_sync()
             print(MCP_SUCCESS_MSG.format(len(portfolio_tools)))
 
-            # Combine local tools with MCP portfolio tools
-            local_tools = [
-                calculator,
-                current_time,
-                read_index,
-                write_index,
-                get_index_info,
-                get_stock_info,
-                get_stock_history,
-                get_multiple_stocks_info,
-                compare_stocks_performance,
-                get_market_summary,
-            ]
-
-            all_tools = local_tools + portfolio_tools
-
-            agent = Agent(
-                model=OpenAIModel(client_args={"api_key": API_KEY}, model_id=MODEL_ID),
-                system_prompt=load_template(system_prompt_name),
-                tools=all_tools,
-            )
-
-            if user_prompt_name:
-                # Standard index update
-                prompt = load_template(user_prompt_name)
-                agent(prompt)
-
-                # After UPDATE completes, automatically generate GPT20.md from database
-                if system_prompt_name == "SYSTEM":
-                    generate_markdown_from_database()
+            tracer = RunTracer(mcp_tool_names=[tool.tool_name for tool in portfolio_tools])
+            if args.stream:
+                from .streaming import run_streaming
+
+                # The stream is printed by run_streaming instead of the default callback handler
+                agent = create_agent(
+                    system_prompt_name, portfolio_tools, hooks=[tracer], async_mode=True, callback_handler=None
+                )
+
+                def run(prompt: str) -> bool:
+                    return run_streaming(agent, prompt, args.deadline) == "completed"
+
             else:
-                # Migration mode - let agent run with system prompt
-                agent(MIGRATION_PROMPT)
+                agent = create_agent(system_prompt_name, portfolio_tools, hooks=[tracer])
+
+                def run(prompt: str) -> bool:
+                    agent(prompt)
+                    return True
+
+            try:
+                if user_prompt_name:
+                    # Standard index update
+                    completed = run(format_template(user_prompt_name, index_name=INDEX_NAME))
+
+                    # After UPDATE completes, automatically generate GPT20.md from database
+                    if system_prompt_name == "SYSTEM":
+                        if completed:
+                            generate_markdown_from_database(mcp_client)
+                        else:
+                            print(RUN_INCOMPLETE_MSG)
+                else:
+                    # Migration mode - let agent run with system prompt
+                    completed = run(MIGRATION_PROMPT.format(INDEX_NAME))
 
-                # After MIGRATION completes, also generate GPT20.md
-                generate_markdown_from_database()
+                    # After MIGRATION completes, also generate GPT20.md
+                    if completed:
+                        generate_markdown_from_database(mcp_client)
+                    else:
+                        print(RUN_INCOMPLETE_MSG)
+            finally:
+                tracer.print_summary()
 
     except Exception as e:
         print(MCP_ERROR_MSG.format(e))
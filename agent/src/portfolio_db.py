@@ -0,0 +1,97 @@
+"""Pooled, keep-alive HTTP clients for all traffic to the portfolio-db service."""
+
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .config import (
+    PORTFOLIO_DB_BACKOFF_SECONDS,
+    PORTFOLIO_DB_HEALTH_TIMEOUT_SECONDS,
+    PORTFOLIO_DB_MAX_CONNECTIONS,
+    PORTFOLIO_DB_READ_TIMEOUT_SECONDS,
+    PORTFOLIO_DB_RETRIES,
+    PORTFOLIO_DB_TIMEOUT_SECONDS,
+    PORTFOLIO_DB_URL,
+)
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+    from strands.tools.mcp import MCPClient
+
+_session: Optional["requests.Session"] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """
+    Return the shared requests session for portfolio-db REST calls.
+
+    Connections are pooled and kept alive between calls; idempotent requests
+    are retried with exponential backoff on connection errors and 502/503/504.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            # requests is most of the CLI's import time, so it is only loaded once a call is made
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=PORTFOLIO_DB_RETRIES,
+                backoff_factor=PORTFOLIO_DB_BACKOFF_SECONDS,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=PORTFOLIO_DB_MAX_CONNECTIONS, max_retries=retry, pool_block=True
+            )
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def health_check() -> "requests.Response":
+    """GET ``/health`` on the shared session; raises ``requests.RequestException`` on failure."""
+    response = get_session().get(f"{PORTFOLIO_DB_URL}/health", timeout=PORTFOLIO_DB_HEALTH_TIMEOUT_SECONDS)
+    response.raise_for_status()
+    return response
+
+
+def _mcp_http_client(
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional["httpx.Timeout"] = None,
+    auth: Optional["httpx.Auth"] = None,
+) -> "httpx.AsyncClient":
+    import httpx
+
+    # streamablehttp_client owns (and closes) the client, so this builds one per MCP session
+    # with a bounded keep-alive pool and connect retries instead of the library defaults
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(PORTFOLIO_DB_TIMEOUT_SECONDS, read=PORTFOLIO_DB_READ_TIMEOUT_SECONDS),
+        auth=auth,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=PORTFOLIO_DB_MAX_CONNECTIONS, max_keepalive_connections=PORTFOLIO_DB_MAX_CONNECTIONS
+        ),
+        transport=httpx.AsyncHTTPTransport(retries=PORTFOLIO_DB_RETRIES),
+    )
+
+
+def connect_portfolio_db() -> "MCPClient":
+    """Create the MCP client for the portfolio-db server (connected on ``with``)."""
+    # MCP and strands are only imported once a session is actually opened
+    from mcp.client.streamable_http import streamablehttp_client
+    from strands.tools.mcp import MCPClient
+
+    return MCPClient(
+        lambda: streamablehttp_client(
+            f"{PORTFOLIO_DB_URL}/mcp",
+            timeout=PORTFOLIO_DB_TIMEOUT_SECONDS,
+            sse_read_timeout=PORTFOLIO_DB_READ_TIMEOUT_SECONDS,
+            httpx_client_factory=_mcp_http_client,
+        )
+    )
@@ -0,0 +1,54 @@
+"""Streaming agent runs: output printed as it is generated, cancelled cleanly on Ctrl-C or a deadline."""
+
+import asyncio
+from typing import Optional
+
+from .config import RUN_CANCELLED_MSG, RUN_DEADLINE_MSG, TOOL_CALL_MSG
+from .tools.async_tools import cancel_pending_tools
+
+
+async def stream_response(agent, prompt: str) -> None:
+    """Print the agent's text token by token, with a marker line when each tool call starts."""
+    announced = set()
+    async for event in agent.stream_async(prompt):
+        if "data" in event:
+            print(event["data"], end="", flush=True)
+        tool_use = event.get("current_tool_use") or {}
+        if tool_use.get("name") and tool_use.get("toolUseId") not in announced:
+            announced.add(tool_use.get("toolUseId"))
+            print(TOOL_CALL_MSG.format(tool_use["name"]), flush=True)
+    print()
+
+
+def run_streaming(agent, prompt: str, deadline_seconds: Optional[float] = None) -> str:
+    """
+    Run ``prompt`` on its own event loop, streaming the output to the terminal.
+
+    Ctrl-C or the deadline cancels the run: the model stream and awaiting tool calls
+    are cancelled, and tool calls still queued for a worker thread are dropped.
+
+    Args:
+        agent: Agent built with async tools (``create_agent(..., async_mode=True)``)
+        prompt: User prompt
+        deadline_seconds: Overall time limit for the run (None for no limit)
+
+    Returns:
+        "completed", "cancelled" (Ctrl-C) or "deadline"
+    """
+
+    async def run() -> None:
+        async with asyncio.timeout(deadline_seconds):
+            await stream_response(agent, prompt)
+
+    try:
+        # asyncio.run turns Ctrl-C into cancellation of run() before raising KeyboardInterrupt
+        asyncio.run(run())
+        return "completed"
+    except TimeoutError:
+        print(RUN_DEADLINE_MSG.format(deadline_seconds))
+        return "deadline"
+    except KeyboardInterrupt:
+        print(RUN_CANCELLED_MSG)
+        return "cancelled"
+    finally:
+        cancel_pending_tools()
@@ -2,30 +2,66 @@
 Tools module for the GPT20 agent.
 
 This module exports all available tools for use with the Strands agent framework.
+Tools are imported on first access (PEP 562 module ``__getattr__``), so importing the
+package does not pull in strands, pandas or yfinance until a tool is actually used.
 """
 
-# Import decorated tools from their respective modules
-from .financial_data import (
-    get_stock_info,
-    get_stock_history,
-    get_multiple_stocks_info,
-    compare_stocks_performance,
-    get_market_summary,
-)
-from .templates import (
-    read_index,
-    write_index,
-    get_index_info,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Static analyzers see the tools as eager imports
+    from .financial_data import (
+        compare_stocks_performance,
+        get_market_summary,
+        get_multiple_stocks_info,
+        get_stock_history,
+        get_stock_info,
+    )
+    from .portfolio_analytics import analyze_portfolio
+    from .rebalancing import rebalance_portfolio
+    from .templates import get_index_holding, get_index_info, query_index_holdings, read_index, write_index
+
+# Tool name -> submodule that defines it
+_TOOL_MODULES = {
+    "read_index": ".templates",
+    "write_index": ".templates",
+    "get_index_info": ".templates",
+    "get_index_holding": ".templates",
+    "query_index_holdings": ".templates",
+    "get_stock_info": ".financial_data",
+    "get_stock_history": ".financial_data",
+    "get_multiple_stocks_info": ".financial_data",
+    "compare_stocks_performance": ".financial_data",
+    "get_market_summary": ".financial_data",
+    "analyze_portfolio": ".portfolio_analytics",
+    "rebalance_portfolio": ".rebalancing",
+}
 
 # Export tools for easy import
 __all__ = [
     "read_index",
     "write_index",
     "get_index_info",
+    "get_index_holding",
+    "query_index_holdings",
     "get_stock_info",
     "get_stock_history",
     "get_multiple_stocks_info",
     "compare_stocks_performance",
     "get_market_summary",
+    "analyze_portfolio",
+    "rebalance_portfolio",
 ]
+
+
+def __getattr__(name):
+    if name not in _TOOL_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_TOOL_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
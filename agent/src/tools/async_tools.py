@@ -0,0 +1,67 @@
+"""
+Cancellable variants of the local tools for streaming runs.
+
+strands already runs synchronous tools off the event loop (through ``asyncio.to_thread``),
+but on the loop's default executor, where a queued call cannot be told apart from any other
+work and keeps running after the run is abandoned. These variants queue on a pool of their
+own that ``cancel_pending_tools`` can drop when a streaming run is cancelled or times out.
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from strands.tools.decorator import DecoratedFunctionTool, tool
+
+from ..config import ASYNC_TOOL_WORKERS
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_TOOL_WORKERS, thread_name_prefix="async-tool")
+        return _executor
+
+
+def to_async_tool(sync_tool: DecoratedFunctionTool) -> DecoratedFunctionTool:
+    """
+    Wrap a ``@tool`` function as an async tool with the same name, docstring and input schema.
+
+    Calls run on this module's worker pool rather than the event loop's default executor,
+    so they can be cancelled: if the awaiting task is cancelled or ``cancel_pending_tools``
+    runs, a call that has not started yet is dropped; one already running finishes on its
+    thread and its result is discarded.
+    """
+    original = inspect.unwrap(sync_tool)
+
+    @functools.wraps(original)
+    async def run(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(original, *args, **kwargs))
+
+    return tool(name=sync_tool.tool_name)(run)
+
+
+def _is_sync_tool(candidate) -> bool:
+    return isinstance(candidate, DecoratedFunctionTool) and not inspect.iscoroutinefunction(inspect.unwrap(candidate))
+
+
+def async_tools(tools: Iterable) -> List:
+    """Return ``tools`` with every synchronous ``@tool`` function replaced by its async variant."""
+    return [to_async_tool(t) if _is_sync_tool(t) else t for t in tools]
+
+
+def cancel_pending_tools() -> None:
+    """Drop queued tool calls and release the worker pool without waiting for running calls."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,49 @@
+"""Atomic file replacement for the index, sidecar, bar store and chart data writers."""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def file_mode(path: Path) -> int:
+    """Permission bits for a new version of ``path``: those of the current file, else 0o666 less the umask."""
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", encoding: Optional[str] = "utf-8") -> Iterator[IO]:
+    """
+    Write ``path`` through a temporary file next to it that replaces it only once fully written.
+
+    Readers never see a partial file, and the file keeps its permissions (``mkstemp``
+    alone would leave every rewritten file readable by its owner only).
+
+    Args:
+        path: File to create or replace
+        mode: "w" for text or "wb" for bytes
+        encoding: Text encoding (ignored for bytes)
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=f"{path.suffix}.tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+        os.chmod(tmp_path, file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,212 @@
+"""Persistent on-disk OHLCV bar store with incremental refresh."""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import BAR_STORE_DIR, BAR_REFRESH_SECONDS, BAR_SEED_PERIOD, PRICE_ADJUSTMENT_TOLERANCE
+from .atomic import atomic_write
+from .providers import COLUMNS, get_provider, period_start, slice_period
+
+
+def _overlap_matches(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """
+    Whether newly fetched bars agree with the cached ones on the sessions both hold.
+
+    Providers return split- and dividend-adjusted bars, so a corporate action since the
+    last fetch rescales every earlier bar; splicing fresh bars onto cached ones would
+    leave a price cliff. The last cached bar is left out as it may have been partial.
+    """
+    overlap = cached.index[:-1].intersection(fresh.index)
+    return bool(
+        np.allclose(
+            cached.loc[overlap, "Close"].to_numpy(dtype="float64"),
+            fresh.loc[overlap, "Close"].to_numpy(dtype="float64"),
+            rtol=PRICE_ADJUSTMENT_TOLERANCE,
+            equal_nan=True,
+        )
+    )
+
+
+class BarStore:
+    """
+    Daily OHLCV bars cached on disk as one columnar ``.npz`` file per ticker.
+
+    Each file records the earliest date its bars are known to cover, so any
+    period inside that range is sliced locally and only bars after the last
+    cached date are fetched on refresh.
+    """
+
+    def __init__(self, root=None, refresh_seconds=BAR_REFRESH_SECONDS):
+        self._root = Path(root) if root else None
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        # Keep each provider's bars apart so replayed fixtures never mix with live data
+        return self._root or BAR_STORE_DIR / get_provider().name
+
+    def _path(self, ticker: str) -> Path:
+        return self.root / f"{ticker.replace('/', '_')}.npz"
+
+    def _load(self, ticker: str) -> Optional[Dict]:
+        path = self._path(ticker)
+        if not path.exists():
+            return None
+
+        with np.load(path) as arrays:
+            frame = pd.DataFrame(
+                {column: arrays[column] for column in COLUMNS},
+                index=pd.DatetimeIndex(arrays["dates"].astype("datetime64[D]"), name="Date"),
+            )
+            covered_from = str(arrays["covered_from"])
+            return {
+                "bars": frame,
+                "covered_from": pd.Timestamp(covered_from) if covered_from else None,
+                "fetched_at": float(arrays["fetched_at"]),
+            }
+
+    def _save(self, ticker: str, bars: pd.DataFrame, covered_from: Optional[pd.Timestamp]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        arrays: Dict[str, Any] = {column: bars[column].to_numpy(dtype="float64") for column in COLUMNS}
+        arrays["dates"] = bars.index.values.astype("datetime64[D]")
+        arrays["covered_from"] = np.array(covered_from.strftime("%Y-%m-%d") if covered_from is not None else "")
+        arrays["fetched_at"] = np.array(time.time())
+
+        # Write to a temporary file first so readers never see a partial store
+        with atomic_write(self._path(ticker), "wb") as f:
+            np.savez(f, **arrays)
+
+    def _refetch(self, tickers: List[str], covered_from: Dict[str, Optional[pd.Timestamp]]) -> Dict:
+        """Download the whole covered range again for tickers whose cached bars were adjusted differently."""
+        by_start: Dict[Optional[pd.Timestamp], List[str]] = {}
+        for ticker in tickers:
+            by_start.setdefault(covered_from[ticker], []).append(ticker)
+
+        updated = {}
+        provider = get_provider()
+        for start, group in by_start.items():
+            if start is None:
+                bars = provider.history(group, period="max")
+            else:
+                bars = provider.history(group, start=start.strftime("%Y-%m-%d"))
+            for ticker in group:
+                if ticker in bars:
+                    updated[ticker] = (bars[ticker], start)
+        return updated
+
+    def history_many(self, tickers: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
+        """
+        Get daily bars for several tickers, downloading anything missing in bulk.
+
+        Tickers whose cached bars cover ``period`` are served from disk. The rest
+        are fetched with at most two batched downloads: one seeding/widening the
+        uncovered tickers and one topping up stale ones from their last cached date.
+        Stale tickers whose history the provider has re-adjusted since (a split or
+        dividend) are downloaded again over their whole covered range.
+
+        Args:
+            tickers: Stock ticker symbols (e.g., ["AAPL", "MSFT"])
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+
+        Returns:
+            dict mapping ticker -> DataFrame of Open/High/Low/Close/Volume indexed by date;
+            tickers without data are omitted
+        """
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        provider = get_provider()
+        today = provider.today()
+        requested_start = period_start(period, today)
+
+        with self._lock:
+            cached = {ticker: self._load(ticker) for ticker in tickers}
+
+        uncovered: List[str] = []
+        stale: Dict[str, Dict] = {}
+        for ticker, entry in cached.items():
+            if entry is None or (
+                entry["covered_from"] is not None
+                and (requested_start is None or requested_start < entry["covered_from"])
+            ):
+                uncovered.append(ticker)
+            elif time.time() - entry["fetched_at"] > self.refresh_seconds:
+                stale[ticker] = entry
+
+        updated = {}
+        if uncovered:
+            # Seed (or widen) the store with at least BAR_SEED_PERIOD so shorter
+            # periods requested later in the run are sliced locally.
+            seed_start = period_start(BAR_SEED_PERIOD, today)
+            fetch_period = (
+                period
+                if requested_start is None or (seed_start is not None and requested_start < seed_start)
+                else BAR_SEED_PERIOD
+            )
+            covered_from = period_start(fetch_period, today)
+            for ticker, bars in provider.history(uncovered, period=fetch_period).items():
+                updated[ticker] = (bars, covered_from)
+
+        if stale:
+            # Refetch from each ticker's last completed cached session: the bar after it may have
+            # been a partial intraday bar, and the overlap shows whether history was re-adjusted
+            start = min(entry["bars"].index[max(-2, -len(entry["bars"]))] for entry in stale.values())
+            fresh = provider.history(list(stale), start=start.strftime("%Y-%m-%d"))
+            readjusted = []
+            for ticker, entry in stale.items():
+                # A ticker the provider returned nothing for keeps its old fetched_at, so it is retried next time
+                if ticker not in fresh:
+                    continue
+                bars = entry["bars"]
+                if not _overlap_matches(bars, fresh[ticker]):
+                    readjusted.append(ticker)
+                    continue
+                bars = pd.concat([bars[bars.index < fresh[ticker].index[0]], fresh[ticker]])
+                updated[ticker] = (bars, entry["covered_from"])
+            updated.update(self._refetch(readjusted, {ticker: stale[ticker]["covered_from"] for ticker in readjusted}))
+
+        with self._lock:
+            for ticker, (bars, covered_from) in updated.items():
+                self._save(ticker, bars, covered_from)
+
+        results = {}
+        for ticker in tickers:
+            entry = cached[ticker]
+            if ticker in updated:
+                bars = updated[ticker][0]
+            elif entry is not None:
+                # Fall back to whatever is cached if widening or topping up the store failed
+                bars = entry["bars"]
+            else:
+                continue
+            results[ticker] = slice_period(bars, period, today)
+        return results
+
+    def history(self, ticker: str, period: str = "1mo") -> pd.DataFrame:
+        """
+        Get daily bars for ``period``, serving from the store where possible.
+
+        Args:
+            ticker: Stock ticker symbol (e.g., "AAPL")
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+
+        Returns:
+            DataFrame of Open/High/Low/Close/Volume indexed by date (empty if no data)
+        """
+        bars = self.history_many([ticker], period)
+        return bars.get(ticker.upper(), pd.DataFrame(columns=pd.Index(COLUMNS)))
+
+
+# Default store instance
+_store = BarStore()
+load_history = _store.history
+load_history_many = _store.history_many
+
+
+def set_store_root(root) -> None:
+    """Point the default store at another directory (None restores the per-provider default)."""
+    _store._root = Path(root) if root else None
@@ -0,0 +1,128 @@
+"""Shared TTL-bounded in-process memoization for the financial data tools."""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple
+
+from ..config import CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+
+_MISSING = object()
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the in-memory footprint of a cached value in bytes."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        # pandas objects report their own (deep) usage far cheaper than pickling them
+        usage: Any = memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 1024
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a per-kind TTL.
+
+    Keys are tuples whose first element is the data kind (e.g. "quote",
+    "fundamentals", "history"); the kind selects the TTL from
+    ``CACHE_TTL_SECONDS``. Least recently used entries are evicted once the
+    entry count or the estimated memory footprint exceeds its cap.
+    """
+
+    def __init__(self, ttl_seconds=None, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.ttl_seconds = dict(ttl_seconds or CACHE_TTL_SECONDS)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _ttl(self, key: Tuple) -> float:
+        return self.ttl_seconds.get(key[0], self.ttl_seconds.get("default", 60))
+
+    def _drop(self, key: Tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Tuple, default: Any = None) -> Any:
+        """Return the cached value for ``key``, or ``default`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[2]
+            if entry is not None:
+                self._drop(key)
+            self._misses += 1
+            return default
+
+    def set(self, key: Tuple, value: Any) -> None:
+        """Store ``value`` under ``key`` with the TTL for its kind, evicting LRU entries as needed."""
+        size = _estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + self._ttl(key), size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def get_or_load(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` and caching its result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def get_many(self, keys: List[Tuple]) -> Tuple[Dict[Tuple, Any], List[Tuple]]:
+        """
+        Look up several keys at once.
+
+        Returns:
+            (dict of hits keyed by cache key, list of missing keys in input order)
+        """
+        hits, missing = {}, []
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                hits[key] = value
+        return hits, missing
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+# Default cache instance shared by all financial data tools
+market_cache = TTLCache()
+cache_stats = market_cache.stats
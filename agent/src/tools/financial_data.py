@@ -1,10 +1,209 @@
-"""Financial data tools using yfinance."""
+"""Financial data tools backed by a pluggable market data provider (yfinance by default)."""
 
-import yfinance as yf
+import pandas as pd
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from strands.tools.decorator import tool
 
+from ..config import (
+    BENCHMARK_TICKER,
+    MARKET_INDEX_TIMEOUT_SECONDS,
+    MARKET_INDICES,
+    QUOTE_FETCH_WORKERS,
+    TRADING_DAYS_PER_YEAR,
+)
+from .bar_store import load_history_many
+from .cache import market_cache
+from .providers import get_provider
+from .shaping import downsample_history, shape_response
+
+
+def _parse_tickers(tickers: str) -> List[str]:
+    """Split a comma-separated ticker string into unique upper-case symbols, preserving order."""
+    return list(dict.fromkeys(t.strip().upper() for t in tickers.split(",") if t.strip()))
+
+
+def _build_stock_info(
+    ticker: str, info: Dict, current_price: Optional[float] = None, previous_close: Optional[float] = None
+) -> Dict:
+    """Shape a yfinance ``info`` dict (plus optional bulk quote prices) into the tool response format."""
+    result = {
+        "ticker": ticker,
+        "name": info.get("longName", "N/A"),
+        "current_price": current_price if current_price is not None else info.get("currentPrice"),
+        "previous_close": previous_close if previous_close is not None else info.get("previousClose"),
+        "market_cap": info.get("marketCap"),
+        "pe_ratio": info.get("trailingPE"),
+        "forward_pe": info.get("forwardPE"),
+        "dividend_yield": info.get("dividendYield"),
+        "52_week_high": info.get("fiftyTwoWeekHigh"),
+        "52_week_low": info.get("fiftyTwoWeekLow"),
+        "sector": info.get("sector"),
+        "industry": info.get("industry"),
+        "success": True,
+    }
+
+    # Calculate price change
+    if result["current_price"] and result["previous_close"]:
+        price_change = result["current_price"] - result["previous_close"]
+        price_change_pct = (price_change / result["previous_close"]) * 100
+        result["price_change"] = price_change
+        result["price_change_pct"] = price_change_pct
+
+    return result
+
+
+def _download_quotes(ticker_list: List[str]) -> Dict[str, Tuple[float, Optional[float]]]:
+    """
+    Fetch the latest and previous close for every ticker in one bulk download.
+
+    Returns:
+        dict mapping ticker -> (current_price, previous_close); tickers without data are omitted
+    """
+    bars = get_provider().history(ticker_list, period="5d")
+    if not bars:
+        return {}
+
+    # Long format (date, ticker) -> close, with missing bars dropped
+    closes = pd.DataFrame({ticker: frame["Close"] for ticker, frame in bars.items()}).stack().dropna()
+    by_ticker = closes.groupby(level=1)
+    last = by_ticker.last()
+    previous = closes.groupby(level=1).tail(2).groupby(level=1).first().loc[by_ticker.size() > 1].to_dict()
+
+    return {str(ticker): (float(price), previous.get(ticker)) for ticker, price in last.items()}
+
+
+def _history_frame(hist) -> pd.DataFrame:
+    """Round and cast a yfinance history frame column-wise into the serialized field layout."""
+    return pd.DataFrame(
+        {
+            "date": hist.index.strftime("%Y-%m-%d"),
+            "open": hist["Open"].round(2).to_numpy(),
+            "high": hist["High"].round(2).to_numpy(),
+            "low": hist["Low"].round(2).to_numpy(),
+            "close": hist["Close"].round(2).to_numpy(),
+            "volume": hist["Volume"].fillna(0).astype("int64").to_numpy(),
+        }
+    )
+
+
+def _history_records(hist) -> List[Dict]:
+    """Convert a history frame to a list of per-day dicts."""
+    return _history_frame(hist).to_dict("records")
+
+
+def _history_columns(hist) -> Dict[str, List]:
+    """Convert a history frame to parallel per-field arrays (compact response mode)."""
+    frame = _history_frame(hist).rename(columns={"date": "dates"})
+    return {str(column): values.tolist() for column, values in frame.items()}
+
+
+def _performance_metrics(closes: pd.DataFrame, benchmark: str) -> pd.DataFrame:
+    """
+    Compute return and risk metrics for every column of an aligned close-price frame in one pass.
+
+    Returns:
+        DataFrame indexed by ticker with return_pct, current_price, start_price,
+        volatility_pct, max_drawdown_pct and correlation_to_benchmark (NaN -> None)
+    """
+    closes = closes.dropna(axis=1, how="all")
+    if closes.empty:
+        return pd.DataFrame(columns=pd.Index(["return_pct"]), index=pd.Index([], name="ticker"))
+
+    returns = closes.pct_change(fill_method=None)
+    first = closes.bfill().iloc[0]
+    last = closes.ffill().iloc[-1]
+
+    metrics = pd.DataFrame(
+        {
+            "return_pct": ((last - first) / first * 100).round(2),
+            "current_price": last.round(2),
+            "start_price": first.round(2),
+            "volatility_pct": (returns.std() * (TRADING_DAYS_PER_YEAR**0.5) * 100).round(2),
+            "max_drawdown_pct": ((closes / closes.cummax() - 1).min() * 100).round(2),
+            "correlation_to_benchmark": (
+                returns.corrwith(returns[benchmark]).round(3) if benchmark in returns else float("nan")
+            ),
+        }
+    )
+    metrics.index.name = "ticker"
+    return metrics.astype(object).where(metrics.notna(), None)
+
+
+def _fetch_info(ticker: str) -> Optional[Dict]:
+    """Fetch the per-ticker ``info`` dict, returning None instead of raising."""
+    try:
+        return get_provider().info(ticker)
+    except Exception:
+        return None
+
+
+def load_stock_data(ticker_list: List[str]) -> Tuple[Dict[str, Dict], Dict[str, Tuple]]:
+    """
+    Load fundamentals and quotes for several tickers through the shared cache.
+
+    Fundamentals missing from the cache are fetched per ticker on a bounded thread
+    pool; a freshly fetched ``info`` also carries the current quote. Quotes that are
+    still missing (cached fundamentals with an expired quote, or ``info`` without
+    prices) are fetched for all remaining tickers in one bulk download.
+
+    Returns:
+        (dict ticker -> info, dict ticker -> (current_price, previous_close)); tickers
+        whose fetch failed are omitted
+    """
+    hits, missing = market_cache.get_many([("fundamentals", ticker) for ticker in ticker_list])
+    infos = {key[1]: info for key, info in hits.items()}
+    quote_hits, quote_missing = market_cache.get_many([("quote", ticker) for ticker in ticker_list])
+    quotes = {key[1]: quote for key, quote in quote_hits.items()}
+
+    if missing:
+        fetch_list = [key[1] for key in missing]
+        with ThreadPoolExecutor(max_workers=max(1, min(QUOTE_FETCH_WORKERS, len(fetch_list)))) as executor:
+            for ticker, info in zip(fetch_list, executor.map(_fetch_info, fetch_list)):
+                if info is None:
+                    continue
+                infos[ticker] = info
+                market_cache.set(("fundamentals", ticker), info)
+                if ticker not in quotes and info.get("currentPrice") is not None:
+                    quotes[ticker] = (info["currentPrice"], info.get("previousClose"))
+                    market_cache.set(("quote", ticker), quotes[ticker])
+
+    bulk_list = [key[1] for key in quote_missing if key[1] not in quotes]
+    if bulk_list:
+        try:
+            downloaded = _download_quotes(bulk_list)
+        except Exception:
+            downloaded = {}
+        for ticker, quote in downloaded.items():
+            quotes[ticker] = quote
+            market_cache.set(("quote", ticker), quote)
+
+    return infos, quotes
+
+
+def load_bars(ticker_list: List[str], period: str) -> Dict[str, pd.DataFrame]:
+    """
+    Load daily bars for several tickers through the shared cache, falling back to the bar store.
+
+    Returns:
+        dict ticker -> OHLCV DataFrame; tickers without data are omitted
+    """
+    hits, missing = market_cache.get_many([("history", ticker, period) for ticker in ticker_list])
+    bars = {key[1]: frame for key, frame in hits.items()}
+    if missing:
+        for ticker, frame in load_history_many([key[1] for key in missing], period).items():
+            bars[ticker] = frame
+            market_cache.set(("history", ticker, period), frame)
+    return bars
+
+
+def load_closes(ticker_list: List[str], period: str) -> pd.DataFrame:
+    """Load closing prices for several tickers as one date-aligned frame (one column per ticker)."""
+    bars = load_bars(ticker_list, period)
+    return pd.DataFrame({ticker: frame["Close"] for ticker, frame in bars.items()}).sort_index()
+
 
 @tool
 def get_stock_info(ticker: str) -> Dict:
@@ -18,34 +217,13 @@ def get_stock_info(ticker: str) -> Dict:
         dict with stock information or error message
     """
     try:
-        stock = yf.Ticker(ticker.upper())
-        info = stock.info
+        ticker = ticker.upper()
+        infos, quotes = load_stock_data([ticker])
+        if ticker not in infos and ticker not in quotes:
+            raise ValueError("No quote or fundamentals data returned")
 
-        # Extract key information
-        result = {
-            "ticker": ticker.upper(),
-            "name": info.get("longName", "N/A"),
-            "current_price": info.get("currentPrice"),
-            "previous_close": info.get("previousClose"),
-            "market_cap": info.get("marketCap"),
-            "pe_ratio": info.get("trailingPE"),
-            "forward_pe": info.get("forwardPE"),
-            "dividend_yield": info.get("dividendYield"),
-            "52_week_high": info.get("fiftyTwoWeekHigh"),
-            "52_week_low": info.get("fiftyTwoWeekLow"),
-            "sector": info.get("sector"),
-            "industry": info.get("industry"),
-            "success": True,
-        }
-
-        # Calculate price change
-        if result["current_price"] and result["previous_close"]:
-            price_change = result["current_price"] - result["previous_close"]
-            price_change_pct = (price_change / result["previous_close"]) * 100
-            result["price_change"] = price_change
-            result["price_change_pct"] = price_change_pct
-
-        return result
+        current_price, previous_close = quotes.get(ticker, (None, None))
+        return shape_response(_build_stock_info(ticker, infos.get(ticker, {}), current_price, previous_close))
 
     except Exception as e:
         return {
@@ -57,22 +235,24 @@ def get_stock_info(ticker: str) -> Dict:
 
 
 @tool
-def get_stock_history(ticker: str, period: str = "1mo") -> Dict:
+def get_stock_history(ticker: str, period: str = "1mo", compact: bool = False) -> Dict:
     """
     Get historical stock price data.
 
     Args:
         ticker: Stock ticker symbol (e.g., "AAPL")
         period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+        compact: Return history as parallel arrays (dates, open, high, low, close, volume)
+            instead of a list of per-day dicts, which is much smaller for long periods
 
     Returns:
-        dict with historical data or error message
+        dict with historical data or error message. Long histories are downsampled to
+        weekly or monthly bars ("interval"); return and price metrics always use daily data.
     """
     try:
-        stock = yf.Ticker(ticker.upper())
-        hist = stock.history(period=period)
+        hist = load_bars([ticker.upper()], period).get(ticker.upper())
 
-        if hist.empty:
+        if hist is None or hist.empty:
             return {
                 "ticker": ticker.upper(),
                 "success": False,
@@ -80,35 +260,29 @@ def get_stock_history(ticker: str, period: str = "1mo") -> Dict:
                 "message": f"No historical data available for {ticker.upper()}",
             }
 
-        # Convert to simple format
-        history_data = []
-        for date, row in hist.iterrows():
-            history_data.append(
-                {
-                    "date": str(date)[:10],
-                    "open": round(float(row["Open"]), 2),
-                    "high": round(float(row["High"]), 2),
-                    "low": round(float(row["Low"]), 2),
-                    "close": round(float(row["Close"]), 2),
-                    "volume": int(row["Volume"]),
-                }
-            )
+        # Convert to simple format, downsampling long periods to fit the response budget
+        bars, interval = downsample_history(hist)
+        history_data = _history_columns(bars) if compact else _history_records(bars)
 
         # Calculate performance metrics
         first_close = hist["Close"].iloc[0]
         last_close = hist["Close"].iloc[-1]
         total_return = ((last_close - first_close) / first_close) * 100
 
-        return {
-            "ticker": ticker.upper(),
-            "period": period,
-            "data_points": len(history_data),
-            "history": history_data,
-            "total_return_pct": round(total_return, 2),
-            "first_price": round(first_close, 2),
-            "last_price": round(last_close, 2),
-            "success": True,
-        }
+        return shape_response(
+            {
+                "ticker": ticker.upper(),
+                "period": period,
+                "interval": interval,
+                "data_points": len(bars),
+                "daily_data_points": len(hist),
+                "history": history_data,
+                "total_return_pct": round(total_return, 2),
+                "first_price": round(first_close, 2),
+                "last_price": round(last_close, 2),
+                "success": True,
+            }
+        )
 
     except Exception as e:
         return {
@@ -130,24 +304,29 @@ def get_multiple_stocks_info(tickers: str) -> Dict:
     Returns:
         dict with information for each stock
     """
-    ticker_list = [t.strip() for t in tickers.split(",")]
+    ticker_list = _parse_tickers(tickers)
     results = {}
     failed_tickers = []
 
+    infos, quotes = load_stock_data(ticker_list)
+
     for ticker in ticker_list:
-        stock_info = get_stock_info(ticker)
-        if stock_info["success"]:
-            results[ticker.upper()] = stock_info
-        else:
-            failed_tickers.append(ticker.upper())
-
-    return {
-        "successful_count": len(results),
-        "failed_count": len(failed_tickers),
-        "failed_tickers": failed_tickers,
-        "stocks": results,
-        "success": len(results) > 0,
-    }
+        if ticker not in infos and ticker not in quotes:
+            failed_tickers.append(ticker)
+            continue
+
+        current_price, previous_close = quotes.get(ticker, (None, None))
+        results[ticker] = _build_stock_info(ticker, infos.get(ticker, {}), current_price, previous_close)
+
+    return shape_response(
+        {
+            "successful_count": len(results),
+            "failed_count": len(failed_tickers),
+            "failed_tickers": failed_tickers,
+            "stocks": results,
+            "success": len(results) > 0,
+        }
+    )
 
 
 @tool
@@ -160,40 +339,93 @@ def compare_stocks_performance(tickers: str, period: str = "1mo") -> Dict:
         period: Time period for comparison (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
 
     Returns:
-        dict with performance comparison
+        dict with performance comparison, including annualized volatility, max drawdown
+        and correlation to the S&P 500 for each stock
     """
     try:
-        ticker_list = [t.strip() for t in tickers.split(",")]
-        performance_data = []
-
-        for ticker in ticker_list:
-            hist_data = get_stock_history(ticker, period)
-            if hist_data["success"]:
-                performance_data.append(
-                    {
-                        "ticker": ticker.upper(),
-                        "return_pct": hist_data["total_return_pct"],
-                        "current_price": hist_data["last_price"],
-                        "start_price": hist_data["first_price"],
-                    }
-                )
-
-        # Sort by performance
-        performance_data.sort(key=lambda x: x["return_pct"], reverse=True)
-
-        return {
-            "period": period,
-            "stocks_compared": len(performance_data),
-            "performance_ranking": performance_data,
-            "best_performer": performance_data[0] if performance_data else None,
-            "worst_performer": performance_data[-1] if performance_data else None,
-            "success": len(performance_data) > 0,
-        }
+        ticker_list = _parse_tickers(tickers)
+
+        # One aligned frame of closes for every ticker plus the benchmark
+        closes = load_closes(ticker_list + [BENCHMARK_TICKER], period)
+        metrics = _performance_metrics(closes, BENCHMARK_TICKER)
+
+        compared = metrics.loc[[ticker for ticker in ticker_list if ticker in metrics.index]]
+        performance_data = compared.sort_values("return_pct", ascending=False).reset_index().to_dict("records")
+
+        benchmark = None
+        if BENCHMARK_TICKER in metrics.index:
+            benchmark = {"ticker": BENCHMARK_TICKER, **metrics.loc[BENCHMARK_TICKER].to_dict()}
+
+        return shape_response(
+            {
+                "period": period,
+                "stocks_compared": len(performance_data),
+                "performance_ranking": performance_data,
+                "best_performer": performance_data[0] if performance_data else None,
+                "worst_performer": performance_data[-1] if performance_data else None,
+                "benchmark": benchmark,
+                "success": len(performance_data) > 0,
+            }
+        )
 
     except Exception as e:
         return {"success": False, "error": str(e), "message": f"Failed to compare stock performance: {str(e)}"}
 
 
+def _fetch_index_quote(ticker: str) -> Dict:
+    """Fetch the latest close and daily change of a market index as a summary entry."""
+    try:
+        # Get last 2 days to calculate change
+        hist = get_provider().history([ticker], period="2d").get(ticker)
+        if hist is None:
+            return {"ticker": ticker, "success": False, "error": "No data returned"}
+
+        if len(hist) >= 2:
+            current = hist["Close"].iloc[-1]
+            previous = hist["Close"].iloc[-2]
+            change_pct = ((current - previous) / previous) * 100
+
+            return {
+                "ticker": ticker,
+                "current_value": round(current, 2),
+                "previous_close": round(previous, 2),
+                "change_pct": round(change_pct, 2),
+                "success": True,
+            }
+        return {"ticker": ticker, "success": False, "error": "Insufficient data"}
+
+    except Exception as e:
+        return {"ticker": ticker, "success": False, "error": str(e)}
+
+
+_index_fetches: Dict[str, Future] = {}
+_index_fetches_lock = threading.Lock()
+
+
+def _start_index_fetch(ticker: str) -> Future:
+    """
+    Fetch an index quote on a daemon thread, joining a fetch of the same index still in flight.
+
+    A fetch that outlives MARKET_INDEX_TIMEOUT_SECONDS is abandoned rather than waited for:
+    it cannot block interpreter exit, and later summaries wait on it instead of piling up
+    more threads and upstream requests (each holding a market data scheduler slot).
+    """
+    with _index_fetches_lock:
+        future = _index_fetches.get(ticker)
+        if future is not None and not future.done():
+            return future
+        future = _index_fetches[ticker] = Future()
+
+    def run():
+        try:
+            future.set_result(_fetch_index_quote(ticker))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"market-index-{ticker}", daemon=True).start()
+    return future
+
+
 @tool
 def get_market_summary() -> Dict:
     """
@@ -202,39 +434,43 @@ def get_market_summary() -> Dict:
     Returns:
         dict with market indices information
     """
-    indices = {"S&P 500": "^GSPC", "Dow Jones": "^DJI", "NASDAQ": "^IXIC", "Russell 2000": "^RUT", "VIX": "^VIX"}
-
     market_data = {}
+    pending = {}
 
-    for name, ticker in indices.items():
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="2d")  # Get last 2 days to calculate change
-
-            if len(hist) >= 2:
-                current = hist["Close"].iloc[-1]
-                previous = hist["Close"].iloc[-2]
-                change_pct = ((current - previous) / previous) * 100
-
-                market_data[name] = {
-                    "ticker": ticker,
-                    "current_value": round(current, 2),
-                    "previous_close": round(previous, 2),
-                    "change_pct": round(change_pct, 2),
-                    "success": True,
-                }
-            else:
-                market_data[name] = {"ticker": ticker, "success": False, "error": "Insufficient data"}
-
-        except Exception as e:
-            market_data[name] = {"ticker": ticker, "success": False, "error": str(e)}
+    for name, ticker in MARKET_INDICES.items():
+        entry = market_cache.get(("market_index", ticker))
+        if entry is not None:
+            market_data[name] = entry
+        else:
+            pending[name] = ticker
+
+    if pending:
+        # Fetch all indices at once so latency is set by the slowest one; an index that
+        # misses the timeout degrades to an error entry instead of stalling the rest.
+        futures = {_start_index_fetch(ticker): name for name, ticker in pending.items()}
+        done, _ = wait(futures, timeout=MARKET_INDEX_TIMEOUT_SECONDS)
+
+        for future, name in futures.items():
+            ticker = pending[name]
+            if future not in done:
+                market_data[name] = {"ticker": ticker, "success": False, "error": "Timed out"}
+                continue
+            entry = future.result()
+            if entry["success"]:
+                market_cache.set(("market_index", ticker), entry)
+            market_data[name] = entry
+
+    # Keep the configured index order in the response
+    market_data = {name: market_data[name] for name in MARKET_INDICES}
 
     successful_indices = sum(1 for data in market_data.values() if data.get("success"))
 
-    return {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "indices": market_data,
-        "successful_count": successful_indices,
-        "total_count": len(indices),
-        "success": successful_indices > 0,
-    }
+    return shape_response(
+        {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "indices": market_data,
+            "successful_count": successful_indices,
+            "total_count": len(MARKET_INDICES),
+            "success": successful_indices > 0,
+        }
+    )
@@ -0,0 +1,157 @@
+"""Structured JSON sidecar for index files: holdings keyed by ticker plus file metadata."""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .atomic import atomic_write
+
+SIDECAR_VERSION = 1
+
+_ENTRY_PATTERN = re.compile(r"^(\d+)\.\s+\*\*(.+)\s+\(([A-Za-z0-9.^=\-]+)\)\*\*\s+-\s+([\d.]+)%")
+_PRICE_PATTERN = re.compile(r"^\s+\*Current Price:\s+\$([\d,]+(?:\.\d+)?)\*")
+_TIER_PATTERN = re.compile(r"^([A-Z]+):\s*(.*)$")
+_LAST_UPDATED_PATTERN = re.compile(r"^\*\*Last Updated:\*\*\s+(.+?)\s*$")
+
+# Parsed sidecars by path, reused while the index file's (mtime, size) is unchanged
+_loaded: Dict[Path, Tuple[Tuple[int, int], Dict]] = {}
+_lock = threading.Lock()
+
+
+def sidecar_path(index_path: Path) -> Path:
+    """Return the sidecar location for an index file (``GPT20.md`` -> ``GPT20.json``)."""
+    return index_path.with_suffix(".json")
+
+
+def parse_holdings(content: str) -> List[Dict]:
+    """
+    Parse the numbered holdings of an index document (generate-md format).
+
+    Returns:
+        holdings in document order with rank, ticker, name, weight, price, tier and comment
+    """
+    holdings = []
+    current = None
+    for line in content.splitlines():
+        entry = _ENTRY_PATTERN.match(line)
+        if entry:
+            current = {
+                "rank": int(entry.group(1)),
+                "ticker": entry.group(3).upper(),
+                "name": entry.group(2).strip(),
+                "weight": float(entry.group(4)),
+                "price": None,
+                "tier": None,
+                "comment": None,
+                "sector": None,
+            }
+            holdings.append(current)
+            continue
+        if current is None or not line.strip():
+            continue
+        if not line.startswith(" "):
+            # Any unindented line (next section, rule) ends the current entry
+            current = None
+            continue
+
+        price = _PRICE_PATTERN.match(line)
+        if price:
+            current["price"] = float(price.group(1).replace(",", ""))
+        elif current["comment"] is None:
+            current["comment"] = line.strip()
+            tier = _TIER_PATTERN.match(current["comment"])
+            if tier:
+                current["tier"] = tier.group(1)
+    return holdings
+
+
+def _stat_key(index_path: Path) -> Tuple[int, int]:
+    stat = index_path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def build_sidecar(index_path: Path, content: str, previous: Optional[Dict] = None) -> Dict:
+    """
+    Build the sidecar for ``content`` (already written to ``index_path``) and write it atomically.
+
+    Sectors are not part of the Markdown; any already resolved in ``previous`` (by default
+    the sidecar currently on disk) are carried over.
+    """
+    if previous is None and sidecar_path(index_path).exists():
+        try:
+            previous = json.loads(sidecar_path(index_path).read_text(encoding="utf-8"))
+        except ValueError:
+            previous = None
+
+    last_updated = None
+    for line in content.splitlines():
+        match = _LAST_UPDATED_PATTERN.match(line)
+        if match:
+            last_updated = match.group(1)
+            break
+
+    known_sectors = {t: h.get("sector") for t, h in (previous or {}).get("holdings", {}).items()}
+    holdings = {}
+    for holding in parse_holdings(content):
+        holding["sector"] = known_sectors.get(holding["ticker"])
+        holdings[holding["ticker"]] = holding
+
+    mtime_ns, size = _stat_key(index_path)
+    sidecar = {
+        "version": SIDECAR_VERSION,
+        "source": {"mtime_ns": mtime_ns, "size_bytes": size},
+        "content_length": len(content),
+        "line_count": len(content.splitlines()),
+        "last_updated": last_updated,
+        "holdings": holdings,
+    }
+    save_sidecar(index_path, sidecar)
+    return sidecar
+
+
+def save_sidecar(index_path: Path, sidecar: Dict) -> None:
+    """Atomically write ``sidecar`` next to ``index_path`` and remember it as current."""
+    path = sidecar_path(index_path)
+    with atomic_write(path) as f:
+        json.dump(sidecar, f, indent=1)
+
+    source = sidecar["source"]
+    with _lock:
+        _loaded[index_path] = ((source["mtime_ns"], source["size_bytes"]), sidecar)
+
+
+def load_sidecar(index_path: Path) -> Optional[Dict]:
+    """
+    Return the sidecar for an existing index file, rebuilding it if the file changed behind its back.
+
+    The freshness check is a ``stat`` of the index file; its content is only read
+    when the sidecar is missing or stale (e.g. after a git checkout or a hand edit).
+
+    Returns:
+        the sidecar dict, or None if the index file does not exist
+    """
+    if not index_path.exists():
+        return None
+    key = _stat_key(index_path)
+
+    with _lock:
+        cached = _loaded.get(index_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    previous = None
+    path = sidecar_path(index_path)
+    if path.exists():
+        try:
+            previous = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            previous = {}
+        source = previous.get("source", {})
+        if previous.get("version") == SIDECAR_VERSION and (source.get("mtime_ns"), source.get("size_bytes")) == key:
+            with _lock:
+                _loaded[index_path] = (key, previous)
+            return previous
+
+    return build_sidecar(index_path, index_path.read_text(encoding="utf-8"), previous or {})
@@ -0,0 +1,221 @@
+"""Portfolio-level risk analytics over weighted holdings, computed in one NumPy pass."""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from strands.tools.decorator import tool
+
+from ..config import BENCHMARK_TICKER, INDEX_NAME, TRADING_DAYS_PER_YEAR
+from .financial_data import load_closes, load_stock_data
+from .index_store import load_sidecar
+from .shaping import shape_response
+from .templates import _get_index_path
+
+
+def parse_weighted_holdings(holdings: str, index_name: str = INDEX_NAME) -> Dict[str, float]:
+    """
+    Parse weighted holdings from a tool argument.
+
+    Accepts "TICKER:weight" pairs ("MSFT:10.5,NVDA:7.5"), the JSON returned by the
+    portfolio-db ``get_holdings`` tool (``Ticker``/``Weight`` keys) or any JSON list of
+    ``ticker``/``weight`` objects. An empty string reads the holdings of ``index_name``.
+
+    Returns:
+        dict ticker -> weight in percent, in the given order
+    """
+    holdings = holdings.strip()
+    if not holdings:
+        sidecar = load_sidecar(_get_index_path(index_name))
+        if sidecar is None:
+            raise ValueError(f"Index file '{index_name}' does not exist")
+        return {ticker: holding["weight"] for ticker, holding in sidecar["holdings"].items()}
+
+    if holdings.startswith(("[", "{")):
+        parsed = json.loads(holdings)
+        items = parsed.get("holdings", []) if isinstance(parsed, dict) else parsed
+        weights = {}
+        for item in items:
+            ticker = item.get("Ticker") or item.get("ticker")
+            weight = item.get("Weight", item.get("weight"))
+            if ticker and weight is not None:
+                weights[ticker.strip().upper()] = float(weight)
+        return weights
+
+    weights = {}
+    for pair in holdings.split(","):
+        if pair.strip():
+            ticker, _, weight = pair.partition(":")
+            weights[ticker.strip().upper()] = float(weight) if weight.strip() else 0.0
+    if weights and not any(weights.values()):
+        # Bare tickers: treat as equal weight
+        weights = dict.fromkeys(weights, 100 / len(weights))
+    return weights
+
+
+def _round(value, digits: int = 2) -> Optional[float]:
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def _matrix(values: np.ndarray, digits: int = 3) -> List[List[Optional[float]]]:
+    return [[_round(value, digits) for value in row] for row in values]
+
+
+def portfolio_risk(closes: pd.DataFrame, weights: Dict[str, float], benchmark: str = BENCHMARK_TICKER) -> Dict:
+    """
+    Compute weighted portfolio return and risk from an aligned close-price frame.
+
+    Rows where any holding (or the benchmark) has no price are dropped so every
+    statistic is computed over the same sessions. Weights are normalized over the
+    holdings that have prices.
+
+    Returns:
+        dict with portfolio metrics, per-holding risk figures and annualized
+        covariance/correlation matrices
+    """
+    tickers = [ticker for ticker in weights if ticker in closes.columns and bool(closes[ticker].notna().any())]
+    if not tickers:
+        raise ValueError("No price history for any holding")
+    columns = tickers + ([benchmark] if benchmark in closes.columns and benchmark not in tickers else [])
+    prices = closes[columns].dropna().to_numpy(dtype="float64")
+    if len(prices) < 3:
+        raise ValueError("Not enough overlapping price history")
+
+    n = len(tickers)
+    w = np.array([weights[ticker] for ticker in tickers], dtype="float64")
+    w = w / w.sum()
+
+    returns = prices[1:] / prices[:-1] - 1
+    cov = np.cov(returns, rowvar=False) * TRADING_DAYS_PER_YEAR
+    cov_assets = cov[:n, :n]
+    volatility = np.sqrt(np.diag(cov_assets))
+    correlation = cov_assets / np.outer(volatility, volatility)
+
+    portfolio_returns = returns[:, :n] @ w
+    portfolio_variance = w @ cov_assets @ w
+    marginal = cov_assets @ w
+    growth = np.cumprod(1 + portfolio_returns)
+    drawdown = growth / np.maximum.accumulate(growth) - 1
+
+    if len(columns) > n:
+        benchmark_variance = cov[n, n]
+        betas = cov[:n, n] / benchmark_variance
+        benchmark_growth = prices[-1, n] / prices[0, n] - 1
+    else:
+        betas = np.full(n, np.nan)
+        benchmark_growth = np.nan
+
+    stock_returns = prices[-1, :n] / prices[0, :n] - 1
+    years = len(returns) / TRADING_DAYS_PER_YEAR
+    return {
+        "portfolio": {
+            "return_pct": _round((w @ stock_returns) * 100),
+            "rebalanced_return_pct": _round((growth[-1] - 1) * 100),
+            "annualized_return_pct": _round((growth[-1] ** (1 / years) - 1) * 100),
+            "volatility_pct": _round(np.sqrt(portfolio_variance) * 100),
+            "beta": _round(w @ betas, 3),
+            "max_drawdown_pct": _round(drawdown.min() * 100),
+            "benchmark_return_pct": _round(benchmark_growth * 100),
+            "diversification_ratio": _round((w @ volatility) / np.sqrt(portfolio_variance), 3),
+        },
+        "holdings": [
+            {
+                "ticker": ticker,
+                "weight_pct": _round(w[i] * 100, 3),
+                "return_pct": _round(stock_returns[i] * 100),
+                "volatility_pct": _round(volatility[i] * 100),
+                "beta": _round(betas[i], 3),
+                "risk_contribution_pct": _round(w[i] * marginal[i] / portfolio_variance * 100),
+            }
+            for i, ticker in enumerate(tickers)
+        ],
+        "covariance": {"tickers": tickers, "matrix": _matrix(cov_assets, 4)},
+        "correlation": {"tickers": tickers, "matrix": _matrix(correlation)},
+        "observations": len(returns),
+    }
+
+
+def sector_concentration(weights: Dict[str, float], sectors: Dict[str, Optional[str]]) -> Tuple[Dict, Dict]:
+    """
+    Summarize how concentrated a set of weights is, overall and by sector.
+
+    Returns:
+        (sector -> weight percent sorted descending, concentration metrics)
+    """
+    total = sum(weights.values()) or 1.0
+    normalized = {ticker: weight / total * 100 for ticker, weight in weights.items()}
+    by_sector: Dict[str, float] = {}
+    for ticker, weight in normalized.items():
+        sector = sectors.get(ticker) or "Unknown"
+        by_sector[sector] = by_sector.get(sector, 0.0) + weight
+    by_sector = {sector: round(weight, 3) for sector, weight in sorted(by_sector.items(), key=lambda i: -i[1])}
+
+    shares = np.array(sorted(normalized.values(), reverse=True)) / 100
+    hhi = float((shares**2).sum())
+    largest_sector = next(iter(by_sector), None)
+    return by_sector, {
+        "top5_weight_pct": round(float(shares[:5].sum()) * 100, 3),
+        "largest_position_pct": round(float(shares[0]) * 100, 3) if len(shares) else None,
+        "largest_sector": largest_sector,
+        "largest_sector_pct": by_sector[largest_sector] if largest_sector is not None else None,
+        "herfindahl_index": round(hhi, 4),
+        "effective_holdings": round(1 / hhi, 2) if hhi else None,
+    }
+
+
+@tool
+def analyze_portfolio(holdings: str = "", period: str = "1y", index_name: str = INDEX_NAME) -> Dict:
+    """
+    Compute portfolio-level risk for weighted holdings in one call.
+
+    Covers weighted return, annualized volatility, beta to the S&P 500, max drawdown,
+    per-holding risk contributions, the correlation/covariance matrices and sector
+    concentration. Use this instead of fetching each holding's history separately.
+
+    Args:
+        holdings: Weighted holdings as "TICKER:weight" pairs (e.g., "MSFT:10.5,NVDA:7.5") or the
+            JSON returned by get_holdings; leave empty to analyze the current index file
+        period: History window (1mo, 3mo, 6mo, 1y, 2y, 5y, ytd, max)
+        index_name: Index file to read when holdings is empty (e.g., "GPT20")
+
+    Returns:
+        dict with portfolio metrics, per-holding risk, sector weights, concentration and matrices
+    """
+    try:
+        weights = parse_weighted_holdings(holdings, index_name)
+        if not weights:
+            return {"success": False, "error": "No holdings to analyze"}
+
+        tickers = list(weights)
+        closes = load_closes(tickers + [BENCHMARK_TICKER], period)
+        risk = portfolio_risk(closes, weights, BENCHMARK_TICKER)
+
+        infos, _ = load_stock_data(tickers)
+        sectors = {ticker: infos.get(ticker, {}).get("sector") for ticker in tickers}
+        for holding in risk["holdings"]:
+            holding["sector"] = sectors.get(holding["ticker"])
+        sector_weights, concentration = sector_concentration(weights, sectors)
+
+        analyzed = {holding["ticker"] for holding in risk["holdings"]}
+        return shape_response(
+            {
+                "period": period,
+                "benchmark": BENCHMARK_TICKER,
+                "total_weight_pct": round(sum(weights.values()), 3),
+                "portfolio": risk["portfolio"],
+                "concentration": concentration,
+                "sector_weights": sector_weights,
+                "holdings": risk["holdings"],
+                "missing_tickers": [ticker for ticker in tickers if ticker not in analyzed],
+                "observations": risk["observations"],
+                "correlation": risk["correlation"],
+                "covariance": risk["covariance"],
+                "success": True,
+            },
+            keep_tail=(),
+        )
+
+    except Exception as e:
+        return {"success": False, "error": str(e), "message": f"Failed to analyze portfolio: {str(e)}"}
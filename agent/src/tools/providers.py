@@ -0,0 +1,372 @@
+"""Market data providers behind the financial data tools."""
+
+import json
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+import pandas as pd
+
+from ..config import (
+    MARKET_DATA_FIXTURES_DIR,
+    MARKET_DATA_HTTP_MAX_CONNECTIONS,
+    MARKET_DATA_HTTP_TIMEOUT_SECONDS,
+    MARKET_DATA_PROVIDER,
+    MARKET_DATA_URL,
+)
+from .cache import market_cache
+from .scheduler import market_data_scheduler
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+_PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+
+def period_start(period: str, today: date) -> Optional[pd.Timestamp]:
+    """
+    Translate a yfinance period string into the first calendar date it covers.
+
+    Returns:
+        start timestamp, or None for "max" (the full history)
+    """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.to_datetime(date(today.year, 1, 1))
+
+    match = _PERIOD_PATTERN.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+
+    count, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        "d": pd.DateOffset(days=count),
+        "wk": pd.DateOffset(weeks=count),
+        "mo": pd.DateOffset(months=count),
+        "y": pd.DateOffset(years=count),
+    }
+    return pd.to_datetime(today) - offsets[unit]
+
+
+def slice_period(bars: pd.DataFrame, period: str, today: date) -> pd.DataFrame:
+    """Slice the bars covered by ``period`` out of a longer date-indexed frame."""
+    # Day periods count trading sessions rather than calendar days, like yfinance does
+    match = _PERIOD_PATTERN.match(period)
+    if match and match.group(2) == "d":
+        return bars.iloc[-int(match.group(1)) :]
+
+    start = period_start(period, today)
+    return bars if start is None else bars.loc[bars.index >= start]
+
+
+def normalize_bars(hist: pd.DataFrame) -> pd.DataFrame:
+    """Reduce a history frame to OHLCV columns indexed by tz-naive session date."""
+    bars = hist[COLUMNS].copy()
+    index = pd.DatetimeIndex(hist.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    bars.index = pd.DatetimeIndex(index.values.astype("datetime64[D]"), name="Date")
+    return bars.loc[~bars.index.duplicated(keep="last")]
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of quotes and daily bars for the financial data tools.
+
+    Every network (or fixture) read in the tool layer goes through these two
+    methods, so implementations can be swapped for benchmarking or for a
+    different vendor without touching the tools themselves.
+    """
+
+    name = "base"
+
+    def today(self) -> date:
+        """Return the date that periods are resolved against."""
+        return date.today()
+
+    @abstractmethod
+    def info(self, ticker: str) -> Dict:
+        """Return the descriptive/fundamental fields for ``ticker`` (yfinance ``info`` layout)."""
+
+    @abstractmethod
+    def history(
+        self, tickers: List[str], period: Optional[str] = None, start: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Return daily bars for several tickers, either for a ``period`` or from ``start`` (inclusive).
+
+        Returns:
+            dict ticker -> OHLCV DataFrame from :func:`normalize_bars`; tickers without data are omitted
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance via yfinance."""
+
+    name = "yfinance"
+
+    def __init__(self):
+        # Imported here rather than at module level: fixture runs and benchmarks never need it
+        import yfinance
+
+        self._yf = yfinance
+
+    def info(self, ticker: str) -> Dict:
+        return market_data_scheduler.call(("info", ticker), lambda: self._yf.Ticker(ticker).info)
+
+    def history(
+        self, tickers: List[str], period: Optional[str] = None, start: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        # yfinance makes one chart request per ticker, so a bulk download costs that many tokens
+        data = market_data_scheduler.call(
+            ("history", tuple(tickers), period, start),
+            lambda: self._yf.download(
+                tickers, period=period, start=start, group_by="ticker", progress=False, threads=True
+            ),
+            cost=len(tickers),
+        )
+        frames = {}
+        if data is None or data.empty:
+            return frames
+
+        for ticker in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                hist = data[ticker]
+            else:
+                hist = data
+            hist = hist.dropna(how="all")
+            if not hist.empty:
+                frames[ticker] = normalize_bars(hist)
+        return frames
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Replays recorded quotes and bars from local files.
+
+    Layout under ``root``: ``info/<TICKER>.json`` holds the ``info`` dict and
+    ``bars/<TICKER>.csv`` the daily OHLCV bars. ``manifest.json`` records the
+    date the set was captured; periods are resolved against that date rather
+    than today, so a fixture set replays the same way whenever it is used.
+    """
+
+    name = "fixtures"
+
+    def __init__(self, root=None):
+        self.root = Path(root or MARKET_DATA_FIXTURES_DIR)
+        self._bars: Dict[str, pd.DataFrame] = {}
+        self._as_of: Optional[date] = None
+
+    def today(self) -> date:
+        if self._as_of is None:
+            manifest = self.root / "manifest.json"
+            if manifest.exists():
+                self._as_of = date.fromisoformat(json.loads(manifest.read_text(encoding="utf-8"))["as_of"])
+            else:
+                self._as_of = date.today()
+        return self._as_of
+
+    @staticmethod
+    def _filename(ticker: str) -> str:
+        return ticker.replace("/", "_")
+
+    def _load_bars(self, ticker: str) -> Optional[pd.DataFrame]:
+        if ticker not in self._bars:
+            path = self.root / "bars" / f"{self._filename(ticker)}.csv"
+            if not path.exists():
+                return None
+            self._bars[ticker] = pd.read_csv(path, index_col="Date", parse_dates=["Date"])
+        return self._bars[ticker]
+
+    def info(self, ticker: str) -> Dict:
+        path = self.root / "info" / f"{self._filename(ticker)}.json"
+        if not path.exists():
+            raise KeyError(f"No recorded info for {ticker}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def history(
+        self, tickers: List[str], period: Optional[str] = None, start: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        frames = {}
+        for ticker in tickers:
+            bars = self._load_bars(ticker)
+            if bars is None or bars.empty:
+                continue
+            if start is not None:
+                bars = bars[bars.index >= pd.Timestamp(start)]
+            elif period is not None:
+                bars = slice_period(bars, period, self.today())
+            if not bars.empty:
+                frames[ticker] = bars
+        return frames
+
+    def record(self, source: MarketDataProvider, tickers: List[str], period: str = "1y") -> List[str]:
+        """
+        Capture info and bars for ``tickers`` from ``source`` into this fixture set.
+
+        Returns:
+            tickers that were recorded successfully
+        """
+        (self.root / "info").mkdir(parents=True, exist_ok=True)
+        (self.root / "bars").mkdir(parents=True, exist_ok=True)
+
+        recorded = []
+        for ticker, bars in source.history(tickers, period=period).items():
+            bars.to_csv(self.root / "bars" / f"{self._filename(ticker)}.csv", index_label="Date")
+            try:
+                info = source.info(ticker)
+            except Exception:
+                info = {}
+            path = self.root / "info" / f"{self._filename(ticker)}.json"
+            path.write_text(json.dumps(info, default=str), encoding="utf-8")
+            self._bars.pop(ticker, None)
+            recorded.append(ticker)
+
+        self._as_of = source.today()
+        manifest = {"as_of": self._as_of.isoformat(), "source": source.name}
+        (self.root / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        return recorded
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Passes every call through to ``source`` and saves the responses as a fixture set.
+
+    Run the agent (or any tool) once with ``MARKET_DATA_PROVIDER=record`` to capture
+    exactly the ``info`` and ``history`` calls the tool layer makes; the result under
+    ``root`` replays with :class:`FixtureProvider` or the benchmark replay server.
+    Bars from repeated history calls are merged per ticker.
+    """
+
+    def __init__(self, source: Optional[MarketDataProvider] = None, root=None):
+        self.source = source or YFinanceProvider()
+        # Bars are cached under the source's name: recording does not change the data
+        self.name = self.source.name
+        self.fixtures = FixtureProvider(root)
+        self._lock = threading.Lock()
+
+    def today(self) -> date:
+        return self.source.today()
+
+    def _write_manifest(self) -> None:
+        manifest = {"as_of": self.today().isoformat(), "source": self.source.name}
+        (self.fixtures.root / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    def info(self, ticker: str) -> Dict:
+        info = self.source.info(ticker)
+        with self._lock:
+            (self.fixtures.root / "info").mkdir(parents=True, exist_ok=True)
+            path = self.fixtures.root / "info" / f"{self.fixtures._filename(ticker)}.json"
+            path.write_text(json.dumps(info, default=str), encoding="utf-8")
+            self._write_manifest()
+        return info
+
+    def history(
+        self, tickers: List[str], period: Optional[str] = None, start: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        frames = self.source.history(tickers, period=period, start=start)
+        with self._lock:
+            (self.fixtures.root / "bars").mkdir(parents=True, exist_ok=True)
+            for ticker, bars in frames.items():
+                recorded = self.fixtures._load_bars(ticker)
+                if recorded is not None:
+                    bars = pd.concat([recorded, bars])
+                    bars = bars.loc[~bars.index.duplicated(keep="last")].sort_index()
+                path = self.fixtures.root / "bars" / f"{self.fixtures._filename(ticker)}.csv"
+                bars.to_csv(path, index_label="Date")
+                self.fixtures._bars[ticker] = bars
+            self._write_manifest()
+        return frames
+
+
+class HTTPProvider(MarketDataProvider):
+    """
+    Quotes and bars from an HTTP service speaking the replay-server protocol.
+
+    ``GET /manifest`` returns ``{"as_of": ...}``, ``GET /info/<TICKER>`` the ``info`` dict
+    and ``GET /history?tickers=A,B&period=1y`` (or ``&start=YYYY-MM-DD``) columnar bars
+    per ticker. Used with ``agent.benchmarks.replay_server`` to load-test the tool layer
+    against injected latency, throttling and errors; requests go through the market data
+    scheduler, and those that still fail raise ``requests.HTTPError``.
+    """
+
+    name = "http"
+
+    def __init__(self, base_url: Optional[str] = None):
+        # Imported here rather than at module level, like yfinance for the live provider
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = (base_url or MARKET_DATA_URL).rstrip("/")
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MARKET_DATA_HTTP_MAX_CONNECTIONS)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._as_of: Optional[date] = None
+
+    def _get(self, path: str, **params):
+        def fetch():
+            url = f"{self.base_url}{path}"
+            response = self._session.get(url, params=params, timeout=MARKET_DATA_HTTP_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            return response.json()
+
+        # Scheduled like yfinance requests, so replay runs exercise the same rate limiting and retries
+        return market_data_scheduler.call((path, tuple(sorted(params.items()))), fetch)
+
+    def today(self) -> date:
+        if self._as_of is None:
+            as_of = self._get("/manifest").get("as_of")
+            self._as_of = date.fromisoformat(as_of) if as_of else date.today()
+        return self._as_of
+
+    def info(self, ticker: str) -> Dict:
+        return self._get(f"/info/{ticker}")
+
+    def history(
+        self, tickers: List[str], period: Optional[str] = None, start: Optional[str] = None
+    ) -> Dict[str, pd.DataFrame]:
+        params = {"tickers": ",".join(tickers)}
+        params.update({"start": start} if start is not None else {"period": period or "1mo"})
+        frames = {}
+        # The parsed response is shared with coalesced callers (see RequestScheduler.call), so it is only read
+        for ticker, columns in self._get("/history", **params).items():
+            index = pd.DatetimeIndex(pd.to_datetime(columns["Date"]), name="Date")
+            frames[ticker] = pd.DataFrame({column: columns[column] for column in COLUMNS}, index=index)
+        return frames
+
+
+PROVIDERS: Dict[str, Type[MarketDataProvider]] = {
+    YFinanceProvider.name: YFinanceProvider,
+    FixtureProvider.name: FixtureProvider,
+    HTTPProvider.name: HTTPProvider,
+    "record": RecordingProvider,
+}
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    """Return the active provider, creating the configured one on first use."""
+    global _provider
+    # Tools run on several threads; without the lock two could each create a provider
+    with _provider_lock:
+        if _provider is None:
+            if MARKET_DATA_PROVIDER not in PROVIDERS:
+                raise ValueError(f"Unknown market data provider: {MARKET_DATA_PROVIDER}")
+            _provider = PROVIDERS[MARKET_DATA_PROVIDER]()
+        return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    """Swap the active provider (e.g. for benchmarks), dropping data memoized from the previous one."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+    market_cache.clear()
@@ -0,0 +1,292 @@
+"""Constraint-aware rebalancing: turns target convictions into a feasible target portfolio."""
+
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+from strands.tools.decorator import tool
+
+from ..config import INDEX_NAME, PORTFOLIO_CONSTRAINTS
+from .financial_data import load_stock_data
+from .index_store import load_sidecar
+from .portfolio_analytics import parse_weighted_holdings
+from .templates import _get_index_path
+
+_TOTAL_WEIGHT = 100.0
+_TOLERANCE = 1e-6
+_CONVERGENCE = 1e-8
+# Group caps are solved this far inside their limit so rounding to 3 decimals cannot push a group over
+_ROUNDING_MARGIN = 0.02
+
+
+def _project_capped_simplex(v: np.ndarray, low: float, high: float, total: float) -> np.ndarray:
+    """Euclidean projection onto {low <= x <= high, sum(x) == total}: find the common shift exactly."""
+    # sum(clip(v - shift)) is piecewise linear and decreasing in the shift, with kinks at v - low and v - high
+    kinks = np.sort(np.concatenate([v - high, v - low]))
+    sums = np.clip(v[None, :] - kinks[:, None], low, high).sum(axis=1)
+    j = np.clip(np.searchsorted(-sums, -total), 1, len(kinks) - 1)
+    a, b = kinks[j - 1], kinks[j]
+    fa, fb = sums[j - 1], sums[j]
+    shift = a if fa == fb else a + (fa - total) * (b - a) / (fa - fb)
+    return np.clip(v - shift, low, high)
+
+
+def _project_group_caps(v: np.ndarray, groups: List[np.ndarray], cap: float) -> np.ndarray:
+    """Project onto {sum(x[g]) <= cap} for disjoint index groups: spread each group's excess evenly."""
+    x = v.copy()
+    for members in groups:
+        excess = x[members].sum() - cap
+        if excess > 0:
+            x[members] -= excess / len(members)
+    return x
+
+
+def _project_top_sum(v: np.ndarray, k: int, cap: float) -> np.ndarray:
+    """
+    Euclidean projection onto {sum of the k largest entries <= cap}.
+
+    The solution lowers the p largest entries by a common ``theta``, flattens the
+    entries tied around the k-th position to a level ``tau`` and leaves the rest;
+    p and the size of the tied block are found by checking the KKT conditions.
+    """
+    n = len(v)
+    if k >= n:
+        return v - max(v.sum() - cap, 0.0) / n
+    order = np.argsort(-v, kind="stable")
+    s = v[order]
+    prefix = np.concatenate([[0.0], np.cumsum(s)])
+    if prefix[k] <= cap:
+        return v
+
+    x = s.copy()
+    theta = (prefix[k] - cap) / k
+    if s[k - 1] - theta >= s[k]:
+        x[:k] -= theta
+    else:
+        for p in range(k):
+            r = k - p
+            for q in range(k, n + 1):
+                m, middle = q - p, prefix[q] - prefix[p]
+                tau = (cap - prefix[p] + p * middle / r) / (p * m / r + r)
+                theta = (middle - m * tau) / r
+                if (
+                    theta >= -_CONVERGENCE
+                    and (p == 0 or s[p - 1] - theta >= tau - _CONVERGENCE)
+                    and s[q - 1] >= tau - _CONVERGENCE
+                    and s[p] <= tau + theta + _CONVERGENCE
+                    and (q == n or s[q] <= tau + _CONVERGENCE)
+                ):
+                    x[:p] -= theta
+                    x[p:q] = tau
+                    break
+            else:
+                continue
+            break
+
+    projected = np.empty_like(x)
+    projected[order] = x
+    return projected
+
+
+def _max_violation(
+    x: np.ndarray, low: float, high: float, top_n: int, top_cap: float, sectors: List[np.ndarray], sector_cap: float
+) -> float:
+    """Largest amount by which ``x`` breaks a bound, the total, the top-N cap or a sector cap."""
+    return max(
+        abs(x.sum() - _TOTAL_WEIGHT),
+        low - x.min(),
+        x.max() - high,
+        np.sort(x)[::-1][:top_n].sum() - top_cap,
+        max((x[members].sum() - sector_cap for members in sectors), default=0.0),
+        0.0,
+    )
+
+
+def solve_weights(
+    targets: np.ndarray,
+    sector_codes: np.ndarray,
+    constraints: Dict = PORTFOLIO_CONSTRAINTS,
+    max_iterations: int = 2000,
+) -> np.ndarray:
+    """
+    Find the weights closest (least squares) to the target weights that satisfy the constraints.
+
+    Uses Dykstra's alternating projections over three convex sets: the capped
+    simplex (per-stock bounds, weights sum to 100), the cap on the N largest
+    weights and the per-sector caps. Each projection is exact and closed form,
+    so a 20-stock solve takes milliseconds.
+
+    Args:
+        targets: Target weights in percent (any positive scale; normalized to 100)
+        sector_codes: Integer sector id per holding (-1 for unknown, which is not capped)
+        constraints: Bounds in the layout of ``PORTFOLIO_CONSTRAINTS``
+
+    Returns:
+        weights in percent, summing to 100
+    """
+    low, high = constraints["min_weight"], constraints["max_weight"]
+    top_n, top_cap = constraints["top_n"], constraints["top_n_max_weight"] - _ROUNDING_MARGIN
+    sector_cap = constraints["sector_max_weight"] - _ROUNDING_MARGIN
+
+    target = targets / targets.sum() * _TOTAL_WEIGHT
+    sectors = [np.flatnonzero(sector_codes == code) for code in np.unique(sector_codes[sector_codes >= 0])]
+
+    projections = [
+        lambda x: _project_capped_simplex(x, low, high, _TOTAL_WEIGHT),
+        lambda x: _project_top_sum(x, top_n, top_cap),
+        lambda x: _project_group_caps(x, sectors, sector_cap),
+    ]
+    x = target.copy()
+    increments = np.zeros((len(projections), len(x)))
+    for _ in range(max_iterations):
+        previous = increments.copy()
+        for i, project in enumerate(projections):
+            y = project(x + increments[i])
+            increments[i] = x + increments[i] - y
+            x = y
+        # x alone can stall for a sweep while still far from the other sets, so also require
+        # settled increments and every constraint to hold before stopping
+        if (
+            np.abs(increments - previous).max() < _CONVERGENCE
+            and _max_violation(x, low, high, top_n, top_cap, sectors, sector_cap) < _CONVERGENCE
+        ):
+            break
+    return _project_capped_simplex(x, low, high, _TOTAL_WEIGHT)
+
+
+def round_weights(weights: np.ndarray, high: float, decimals: int = 3) -> np.ndarray:
+    """Round to the precision portfolio-db stores, moving the rounding residual onto the largest weight with room."""
+    rounded = np.round(weights, decimals)
+    residual = round(_TOTAL_WEIGHT - rounded.sum(), decimals)
+    # Only absorb rounding error; a larger gap means the bounds were infeasible and is reported instead
+    if residual and abs(residual) <= len(weights) * 0.5 * 10**-decimals + _TOLERANCE:
+        order = np.argsort(-rounded, kind="stable")
+        room = order[rounded[order] + residual <= high + _TOLERANCE]
+        rounded[room[0] if len(room) else order[0]] += residual
+    return np.round(rounded, decimals)
+
+
+def check_constraints(
+    weights: np.ndarray, sectors: List[Optional[str]], constraints: Dict = PORTFOLIO_CONSTRAINTS
+) -> List[str]:
+    """Return a human-readable message for every violated index rule (empty when the portfolio is valid)."""
+    violations = []
+    if len(weights) != constraints["holdings"]:
+        violations.append(f"{len(weights)} holdings; the index needs exactly {constraints['holdings']}")
+    if abs(weights.sum() - _TOTAL_WEIGHT) > 0.01:
+        violations.append(f"weights sum to {weights.sum():.3f}%")
+    if weights.min() < constraints["min_weight"] - _TOLERANCE:
+        violations.append(f"smallest weight {weights.min():.3f}% is below {constraints['min_weight']}%")
+    if weights.max() > constraints["max_weight"] + _TOLERANCE:
+        violations.append(f"largest weight {weights.max():.3f}% is above {constraints['max_weight']}%")
+    top = np.sort(weights)[::-1][: constraints["top_n"]].sum()
+    if top > constraints["top_n_max_weight"] + _TOLERANCE:
+        violations.append(f"top {constraints['top_n']} weigh {top:.3f}% (max {constraints['top_n_max_weight']}%)")
+    for sector in sorted({s for s in sectors if s}):
+        total = weights[[s == sector for s in sectors]].sum()
+        if total > constraints["sector_max_weight"] + _TOLERANCE:
+            violations.append(f"{sector} weighs {total:.3f}% (max {constraints['sector_max_weight']}%)")
+    return violations
+
+
+def _parse_targets(targets: str) -> Dict[str, Dict]:
+    # JSON lists may carry name/comment/sector per holding; anything else goes through the weight parser
+    if targets.strip().startswith("["):
+        parsed = {}
+        for item in json.loads(targets):
+            ticker = item.get("ticker") or item.get("Ticker")
+            if not ticker:
+                continue
+            parsed[ticker.strip().upper()] = {
+                "conviction": float(item.get("conviction", item.get("weight", item.get("Weight", 0)))),
+                "name": item.get("name") or item.get("Name"),
+                "comment": item.get("comment"),
+                "sector": item.get("sector"),
+            }
+        return parsed
+    return {ticker: {"conviction": value} for ticker, value in parse_weighted_holdings(targets).items()}
+
+
+@tool
+def rebalance_portfolio(targets: str, index_name: str = INDEX_NAME) -> Dict:
+    """
+    Turn target convictions into a complete portfolio that satisfies the index rules.
+
+    Solves for the weights closest to the targets with 2-12% per stock, top 5 at most
+    50% combined and no sector above 40%, summing to exactly 100%. Names, prices and
+    sectors are filled in from market data; comments are kept from the current index
+    unless given. When "feasible" is true, pass "target_portfolio" to set_target_portfolio
+    as is; otherwise fix the listed violations (e.g. add holdings) and solve again.
+
+    Args:
+        targets: Target weights or conviction scores as "TICKER:value" pairs (e.g., "MSFT:11,NVDA:9,...")
+            or a JSON list of {"ticker", "conviction", optional "name", "comment", "sector"}
+        index_name: Index whose current holdings supply comments and the weight changes (e.g., "GPT20")
+
+    Returns:
+        dict with target_portfolio ({"holdings": [...]}) plus feasibility, violations,
+        sector weights and the change of each weight against the targets and current index
+    """
+    try:
+        parsed = _parse_targets(targets)
+        if not parsed:
+            return {"success": False, "error": "No targets given"}
+        tickers = list(parsed)
+
+        infos, quotes = load_stock_data(tickers)
+        sidecar = load_sidecar(_get_index_path(index_name)) or {"holdings": {}}
+        current = sidecar["holdings"]
+
+        sectors = [parsed[t].get("sector") or infos.get(t, {}).get("sector") for t in tickers]
+        codes = {sector: code for code, sector in enumerate(sorted({s for s in sectors if s}))}
+        sector_codes = np.array([codes.get(sector, -1) for sector in sectors])
+        convictions = np.array([max(parsed[t]["conviction"], 0.0) for t in tickers], dtype="float64")
+        if not convictions.sum():
+            return {"success": False, "error": "Targets must include positive weights or convictions"}
+
+        weights = round_weights(solve_weights(convictions, sector_codes), PORTFOLIO_CONSTRAINTS["max_weight"])
+        violations = check_constraints(weights, sectors)
+        target_weights = convictions / convictions.sum() * 100
+
+        holdings = []
+        for i, ticker in enumerate(tickers):
+            info, existing = infos.get(ticker, {}), current.get(ticker, {})
+            price = quotes.get(ticker, (None, None))[0] or info.get("currentPrice") or existing.get("price")
+            holding = {
+                "ticker": ticker,
+                "name": parsed[ticker].get("name") or info.get("longName") or existing.get("name") or ticker,
+                "weight": float(weights[i]),
+                "price": round(float(price), 2) if price else 0.0,
+            }
+            comment = parsed[ticker].get("comment") or existing.get("comment")
+            if comment:
+                holding["comment"] = comment
+            holdings.append(holding)
+
+        sector_weights: Dict[str, float] = {}
+        for sector, weight in zip(sectors, weights):
+            sector_weights[sector or "Unknown"] = round(sector_weights.get(sector or "Unknown", 0.0) + float(weight), 3)
+
+        return {
+            "feasible": not violations,
+            "violations": violations,
+            "target_portfolio": {"holdings": holdings},
+            "adjustments": [
+                {
+                    "ticker": ticker,
+                    "target_weight": round(float(target_weights[i]), 3),
+                    "weight": float(weights[i]),
+                    "current_weight": current.get(ticker, {}).get("weight"),
+                }
+                for i, ticker in enumerate(tickers)
+                if abs(weights[i] - target_weights[i]) >= 0.001 or current.get(ticker, {}).get("weight") != weights[i]
+            ],
+            "removed_from_index": [ticker for ticker in current if ticker not in parsed],
+            "sector_weights": dict(sorted(sector_weights.items(), key=lambda item: -item[1])),
+            "top5_weight_pct": round(float(np.sort(weights)[::-1][: PORTFOLIO_CONSTRAINTS["top_n"]].sum()), 3),
+            "missing_prices": [h["ticker"] for h in holdings if not h["price"]],
+            "success": True,
+        }
+
+    except Exception as e:
+        return {"success": False, "error": str(e), "message": f"Failed to rebalance portfolio: {str(e)}"}
@@ -0,0 +1,230 @@
+"""Rate-limit aware scheduler that every upstream market data request goes through."""
+
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from ..config import (
+    MARKET_DATA_BACKOFF_MAX_SECONDS,
+    MARKET_DATA_BACKOFF_SECONDS,
+    MARKET_DATA_BURST,
+    MARKET_DATA_MAX_CONCURRENCY,
+    MARKET_DATA_RATE_PER_SECOND,
+    MARKET_DATA_RETRIES,
+    MARKET_DATA_THROTTLE_PAUSE_SECONDS,
+)
+
+
+# requests/urllib3 exception names, matched without importing either
+_TRANSIENT_ERRORS = {"ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout"}
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether ``error`` means the upstream is rate limiting us (HTTP 429 / yfinance's rate-limit error)."""
+    return _status_code(error) == 429 or type(error).__name__ == "YFRateLimitError" or "Too Many Requests" in str(error)
+
+
+def is_transient(error: BaseException) -> bool:
+    """Whether a retry can succeed: throttling, 5xx responses, dropped connections and timeouts."""
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return (
+        is_throttled(error)
+        or isinstance(error, (ConnectionError, TimeoutError))
+        or type(error).__name__ in _TRANSIENT_ERRORS
+    )
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RequestScheduler:
+    """
+    Token-bucket rate limiting, single-flight coalescing and jittered retries for upstream calls.
+
+    Requests spend ``cost`` tokens from a bucket refilled at ``rate`` per second (up to
+    ``burst``) and at most ``max_concurrency`` run at once. Identical concurrent requests
+    (same key) share one upstream call. A throttled response pauses the whole bucket for
+    its ``Retry-After`` (or ``throttle_pause``) so the other queued requests do not spend
+    their own attempts on the same limit; throttled and transient failures are retried
+    with full-jitter exponential backoff, anything else fails immediately.
+    """
+
+    def __init__(
+        self,
+        rate: float = MARKET_DATA_RATE_PER_SECOND,
+        burst: int = MARKET_DATA_BURST,
+        max_concurrency: int = MARKET_DATA_MAX_CONCURRENCY,
+        retries: int = MARKET_DATA_RETRIES,
+        backoff: float = MARKET_DATA_BACKOFF_SECONDS,
+        backoff_max: float = MARKET_DATA_BACKOFF_MAX_SECONDS,
+        throttle_pause: float = MARKET_DATA_THROTTLE_PAUSE_SECONDS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.throttle_pause = throttle_pause
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._inflight: Dict[Hashable, Future] = {}
+        self._random = random.Random()
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self._requests = self._sent = self._coalesced = self._throttled = 0
+        self._retries = self._failed = self._queued = self._max_queued = 0
+        self._wait_seconds = 0.0
+
+    def _take_tokens(self, cost: float) -> None:
+        # Costs above the bucket size would never fit; they just drain it
+        cost = min(cost, self.burst)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                else:
+                    delay = (cost - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def _pause(self, seconds: float) -> None:
+        with self._lock:
+            self._throttled += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+    def _attempt(self, fn: Callable[[], Any], cost: float) -> Any:
+        started = time.monotonic()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        try:
+            self._slots.acquire()
+            try:
+                self._take_tokens(cost)
+            except BaseException:
+                self._slots.release()
+                raise
+        finally:
+            with self._lock:
+                self._queued -= 1
+                self._wait_seconds += time.monotonic() - started
+
+        try:
+            with self._lock:
+                self._sent += 1
+            return fn()
+        finally:
+            self._slots.release()
+
+    def _execute(self, fn: Callable[[], Any], cost: float) -> Any:
+        for attempt in range(self.retries + 1):
+            try:
+                return self._attempt(fn, cost)
+            except Exception as e:
+                if not is_transient(e) or attempt == self.retries:
+                    with self._lock:
+                        self._failed += 1
+                    raise
+                retry_after = _retry_after(e)
+                if is_throttled(e):
+                    self._pause(retry_after if retry_after is not None else self.throttle_pause)
+                with self._lock:
+                    self._retries += 1
+                ceiling = min(self.backoff_max, self.backoff * 2**attempt)
+                time.sleep(max(retry_after or 0.0, self._random.uniform(0, ceiling)))
+
+    def call(self, key: Hashable, fn: Callable[[], Any], cost: float = 1) -> Any:
+        """
+        Run ``fn`` under the rate limit, sharing the result with concurrent calls for the same ``key``.
+
+        Every caller coalesced onto one call gets the very same result object, so callers
+        must treat it as read-only and copy anything they want to modify.
+
+        Args:
+            key: Identifies the upstream request (e.g. ("info", "AAPL"))
+            fn: Performs the request
+            cost: Upstream requests ``fn`` makes (e.g. one per ticker in a bulk download)
+
+        Returns:
+            the (shared) result of ``fn``; its exception is raised to every caller sharing the call
+        """
+        with self._lock:
+            self._requests += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self._coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._execute(fn, cost)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request, coalescing, throttling and queueing counters."""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "sent": self._sent,
+                "coalesced": self._coalesced,
+                "throttled": self._throttled,
+                "retries": self._retries,
+                "failed": self._failed,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queued,
+                "wait_seconds": round(self._wait_seconds, 3),
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._reset_stats()
+
+
+def format_scheduler_stats(stats: Dict[str, Any]) -> str:
+    """One-line summary of ``RequestScheduler.stats()`` for run and benchmark reports."""
+    return (
+        f"{stats['sent']} sent, {stats['coalesced']} coalesced, {stats['throttled']} throttled, "
+        f"{stats['retries']} retries, {stats['failed']} failed, max queue {stats['max_queue_depth']}, "
+        f"{stats['wait_seconds']:.1f}s waiting"
+    )
+
+
+# Default scheduler shared by the upstream market data providers
+market_data_scheduler = RequestScheduler()
+scheduler_stats = market_data_scheduler.stats
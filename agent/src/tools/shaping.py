@@ -0,0 +1,165 @@
+"""Response shaping that keeps tool results inside a byte budget for the LLM context."""
+
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from strands.experimental.hooks import AfterToolInvocationEvent
+from strands.hooks import HookProvider, HookRegistry
+
+from ..config import HISTORY_MAX_POINTS, TOOL_RESPONSE_MAX_BYTES
+
+# Resampling steps tried in order when a history has too many points
+_INTERVALS = [("1wk", "W-FRI"), ("1mo", "M")]
+_OHLCV_AGGREGATION = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def payload_size(payload: Any) -> int:
+    """Size of ``payload`` in bytes once serialized compactly as JSON."""
+    return len(json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def compact_number(value: float):
+    """Format a float compactly: integral values as int, 2 decimals above 1, 3 significant digits below."""
+    if value != value or value in (float("inf"), float("-inf")):
+        return None
+    if value == int(value) and abs(value) < 1e15:
+        return int(value)
+    if abs(value) >= 1:
+        return round(value, 2)
+    return float(f"{value:.3g}")
+
+
+def compact(value: Any) -> Any:
+    """Recursively drop None fields and compact floats."""
+    if isinstance(value, dict):
+        return {key: compact(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [compact(item) for item in value]
+    if isinstance(value, float) or getattr(getattr(value, "dtype", None), "kind", None) in ("f", "i", "u"):
+        return compact_number(float(value))
+    return value
+
+
+def downsample_history(hist: pd.DataFrame, max_points: int = HISTORY_MAX_POINTS) -> Tuple[pd.DataFrame, str]:
+    """
+    Resample daily OHLCV bars to weekly, then monthly bars until at most ``max_points`` remain.
+
+    Returns:
+        (resampled frame indexed by the last session of each bar, interval label)
+    """
+    if len(hist) <= max_points:
+        return hist, "1d"
+
+    resampled, interval = hist, "1d"
+    for interval, freq in _INTERVALS:
+        # Label each bar with its last real session rather than the calendar period end
+        grouped = hist.assign(Date=hist.index).groupby(pd.DatetimeIndex(hist.index).to_period(freq))
+        resampled = grouped.agg({**_OHLCV_AGGREGATION, "Date": "last"}).set_index("Date")
+        if len(resampled) <= max_points:
+            break
+    return resampled, interval
+
+
+def _truncate(value: Any, count: int, keep_tail: bool) -> Any:
+    if isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+        # Parallel arrays (compact history): cut every column together
+        return {key: (items[-count:] if keep_tail and count else items[:count]) for key, items in value.items()}
+    if isinstance(value, dict):
+        return dict(list(value.items())[:count])
+    return value[-count:] if keep_tail and count else value[:count]
+
+
+def _length(value: Any) -> int:
+    if isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+        return max(len(v) for v in value.values())
+    return len(value)
+
+
+def shape_response(
+    payload: Dict,
+    max_bytes: int = TOOL_RESPONSE_MAX_BYTES,
+    keep_tail: Iterable[str] = ("history",),
+) -> Dict:
+    """
+    Compact a tool response and trim its largest collection until it fits ``max_bytes``.
+
+    Scalar fields (the key metrics) are never dropped. When a list or dict has to
+    be cut, a ``truncated`` entry reports which field, how many items it had and
+    how many were kept. Fields named in ``keep_tail`` keep their most recent items.
+    """
+    shaped = compact(payload)
+    if payload_size(shaped) <= max_bytes:
+        return shaped
+
+    truncated = {}
+    collections = sorted(
+        (key for key, value in shaped.items() if isinstance(value, (list, dict)) and value),
+        key=lambda key: payload_size(shaped[key]),
+        reverse=True,
+    )
+    for key in collections:
+        original = shaped[key]
+        total = _length(original)
+
+        # Binary search for the largest prefix/suffix that fits the remaining budget
+        low, high = 0, total
+        while low < high:
+            middle = (low + high + 1) // 2
+            shaped[key] = _truncate(original, middle, key in keep_tail)
+            report = {**truncated, key: {"total": total, "returned": middle}}
+            if payload_size({**shaped, "truncated": report}) <= max_bytes:
+                low = middle
+            else:
+                high = middle - 1
+
+        shaped[key] = _truncate(original, low, key in keep_tail)
+        if low < total:
+            truncated[key] = {"total": total, "returned": low}
+        if payload_size({**shaped, "truncated": truncated}) <= max_bytes:
+            break
+
+    if truncated:
+        shaped["truncated"] = truncated
+    return shaped
+
+
+def _compact_json_text(text: str, max_bytes: int) -> Optional[str]:
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(parsed, dict):
+        parsed = shape_response(parsed, max_bytes)
+    elif isinstance(parsed, list):
+        parsed = shape_response({"items": parsed}, max_bytes, keep_tail=())
+        parsed = parsed if "truncated" in parsed else parsed["items"]
+    return json.dumps(parsed, separators=(",", ":"), default=str)
+
+
+class ToolResponseShaper(HookProvider):
+    """
+    Strands hook that compacts JSON text returned by MCP tools.
+
+    portfolio-db returns pretty-printed JSON (``json.MarshalIndent``); this
+    re-serializes it without whitespace or null fields and applies the same
+    byte budget as the local tools, which shape their own responses.
+    """
+
+    def __init__(self, tool_names: Iterable[str], max_bytes: int = TOOL_RESPONSE_MAX_BYTES):
+        self.tool_names = set(tool_names)
+        self.max_bytes = max_bytes
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(AfterToolInvocationEvent, self._after_tool)
+
+    def _after_tool(self, event: AfterToolInvocationEvent) -> None:
+        if event.tool_use["name"] not in self.tool_names or not event.result:
+            return
+
+        content = []
+        for block in event.result.get("content", []):
+            text = block.get("text") if isinstance(block, dict) else None
+            compacted = _compact_json_text(text, self.max_bytes) if text else None
+            content.append({**block, "text": compacted} if compacted is not None else block)
+        event.result = {**event.result, "content": content}
@@ -1,30 +1,80 @@
 """Template and index file utilities."""
 
+import threading
 from pathlib import Path
 from string import Template
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
 from strands.tools.decorator import tool
 
+from ..config import INDEX_CONTENT_MAX_CHARS
+from .atomic import atomic_write
+from .index_store import build_sidecar, load_sidecar, save_sidecar
+
 
 class TemplateLoader:
-    def __init__(self, templates_dir=None):
+    """
+    Loads Markdown prompt templates, keeping compiled templates in memory.
+
+    Each template is cached with the (mtime, size) of its file, so repeat loads
+    cost one ``stat`` and an edited prompt is picked up on the next load. The
+    placeholder names are computed once per compile.
+    """
+
+    def __init__(self, templates_dir=None, warm=False):
         self.templates_dir = templates_dir or Path(__file__).parent.parent.parent / "md" / "prompts"
+        self._compiled: Dict[str, Tuple[Tuple[int, int], str, Template, FrozenSet[str]]] = {}
+        self._lock = threading.Lock()
+        if warm:
+            self.warm()
 
-    def load_template(self, template_name):
+    def _compile(self, template_name):
         if not template_name.endswith(".md"):
             template_name += ".md"
         template_path = self.templates_dir / template_name
-        return template_path.read_text(encoding="utf-8")
+        stat = template_path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._compiled.get(template_name)
+        if cached is not None and cached[0] == key:
+            return cached
+
+        content = template_path.read_text(encoding="utf-8")
+        template = Template(content)
+        compiled = (key, content, template, frozenset(template.get_identifiers()))
+        with self._lock:
+            self._compiled[template_name] = compiled
+        return compiled
+
+    def load_template(self, template_name):
+        return self._compile(template_name)[1]
 
     def format_template(self, template_name, **kwargs):
-        template_content = self.load_template(template_name)
-        template = Template(template_content)
-        return template.safe_substitute(**kwargs)
+        return self._compile(template_name)[2].safe_substitute(**kwargs)
+
+    def placeholders(self, template_name) -> FrozenSet[str]:
+        """Return the ``$name`` placeholders used by a template."""
+        return self._compile(template_name)[3]
+
+    def missing_variables(self, template_name, **kwargs) -> FrozenSet[str]:
+        """Return the placeholders of a template that ``kwargs`` would leave unfilled."""
+        return self.placeholders(template_name) - kwargs.keys()
+
+    def warm(self) -> List[str]:
+        """Compile every template in the templates directory; returns their names."""
+        names = sorted(path.stem for path in self.templates_dir.glob("*.md"))
+        for name in names:
+            self._compile(name)
+        return names
 
 
 # Default loader instance
 _loader = TemplateLoader()
 load_template = _loader.load_template
 format_template = _loader.format_template
+template_placeholders = _loader.placeholders
+warm_templates = _loader.warm
 
 
 def _get_index_path(index_name):
@@ -43,7 +93,13 @@ def _read_index_for_update(index_name):
 def _write_index(index_name, content):
     index_path = _get_index_path(index_name)
     index_path.parent.mkdir(parents=True, exist_ok=True)
-    index_path.write_text(content, encoding="utf-8")
+
+    # Write to a temporary file first so readers (and the page build) never see a partial index
+    with atomic_write(index_path) as f:
+        f.write(content)
+
+    # Keep the structured sidecar (holdings by ticker, file metadata) in step with the Markdown
+    build_sidecar(index_path, content)
     return index_path
 
 
@@ -59,13 +115,16 @@ def read_index(index_name: str) -> dict:
         dict with 'content' and 'exists' keys
     """
     content, exists = _read_index_for_update(index_name)
-    return {
-        "content": content,
+    result = {
+        "content": content[:INDEX_CONTENT_MAX_CHARS],
         "exists": exists,
         "message": (
             f"Successfully read index file '{index_name}'" if exists else f"Index file '{index_name}' does not exist"
         ),
     }
+    if len(content) > INDEX_CONTENT_MAX_CHARS:
+        result["truncated"] = {"content": {"total": len(content), "returned": INDEX_CONTENT_MAX_CHARS}}
+    return result
 
 
 @tool
@@ -101,15 +160,99 @@ def get_index_info(index_name: str) -> dict:
     """
     index_path = _get_index_path(index_name)
 
-    if index_path.exists():
-        content = index_path.read_text(encoding="utf-8")
+    sidecar = load_sidecar(index_path)
+    if sidecar is not None:
         return {
             "exists": True,
             "path": str(index_path),
-            "size_bytes": index_path.stat().st_size,
-            "content_length": len(content),
-            "line_count": len(content.splitlines()),
-            "message": f"Index file '{index_name}' exists with {len(content)} characters",
+            "size_bytes": sidecar["source"]["size_bytes"],
+            "content_length": sidecar["content_length"],
+            "line_count": sidecar["line_count"],
+            "holdings_count": len(sidecar["holdings"]),
+            "last_updated": sidecar["last_updated"],
+            "message": f"Index file '{index_name}' exists with {sidecar['content_length']} characters",
         }
     else:
         return {"exists": False, "path": str(index_path), "message": f"Index file '{index_name}' does not exist"}
+
+
+def _resolve_sectors(index_path: Path, sidecar: dict) -> None:
+    # Sectors are not in the Markdown: look up the missing ones once and persist them in the sidecar
+    missing = [ticker for ticker, holding in sidecar["holdings"].items() if not holding.get("sector")]
+    if not missing:
+        return
+
+    # Deferred so reading templates and index files does not import pandas/yfinance
+    from .financial_data import load_stock_data
+
+    infos, _ = load_stock_data(missing)
+    for ticker in missing:
+        sidecar["holdings"][ticker]["sector"] = infos.get(ticker, {}).get("sector")
+    save_sidecar(index_path, sidecar)
+
+
+@tool
+def get_index_holding(index_name: str, ticker: str) -> dict:
+    """
+    Look up one holding of an index without reading the whole index file.
+
+    Args:
+        index_name: Name of the index file (e.g., "GPT20")
+        ticker: Stock ticker symbol (e.g., "AAPL")
+
+    Returns:
+        dict with the holding's rank, name, weight, price, tier and comment, or an error
+    """
+    sidecar = load_sidecar(_get_index_path(index_name))
+    if sidecar is None:
+        return {"error": f"Index file '{index_name}' does not exist", "success": False}
+
+    holding = sidecar["holdings"].get(ticker.strip().upper())
+    if holding is None:
+        return {"error": f"{ticker.upper()} is not a holding of '{index_name}'", "success": False}
+    return {**holding, "success": True}
+
+
+@tool
+def query_index_holdings(
+    index_name: str,
+    min_weight: float = 0.0,
+    max_weight: float = 100.0,
+    tier: str = "",
+    sector: str = "",
+) -> dict:
+    """
+    Find the holdings of an index within a weight range and/or in a tier or sector.
+
+    Args:
+        index_name: Name of the index file (e.g., "GPT20")
+        min_weight: Minimum weight in percent (inclusive)
+        max_weight: Maximum weight in percent (inclusive)
+        tier: Conviction tier to match (e.g., "CORE", "GROWTH", "DEFENSIVE"); empty for any
+        sector: Sector to match (e.g., "Technology"); empty for any. Sectors are looked
+            up once per holding and then kept with the index
+
+    Returns:
+        dict with the matching holdings (by rank) and their total weight
+    """
+    index_path = _get_index_path(index_name)
+    sidecar: Optional[dict] = load_sidecar(index_path)
+    if sidecar is None:
+        return {"error": f"Index file '{index_name}' does not exist", "success": False}
+    if sector:
+        _resolve_sectors(index_path, sidecar)
+
+    matches = [
+        holding
+        for holding in sidecar["holdings"].values()
+        if min_weight <= holding["weight"] <= max_weight
+        and (not tier or (holding.get("tier") or "").upper() == tier.strip().upper())
+        and (not sector or (holding.get("sector") or "").lower() == sector.strip().lower())
+    ]
+    return {
+        "index_name": index_name,
+        "count": len(matches),
+        "total_weight": round(sum(holding["weight"] for holding in matches), 3),
+        "holdings": matches,
+        "success": True,
+    }
@@ -0,0 +1,176 @@
+"""Per-call instrumentation for agent runs: tool/model spans written as JSONL plus a summary table."""
+
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from strands.experimental.hooks import (
+    AfterModelInvocationEvent,
+    AfterToolInvocationEvent,
+    BeforeModelInvocationEvent,
+    BeforeToolInvocationEvent,
+)
+from strands.hooks import HookProvider, HookRegistry
+
+from .config import TRACE_DIR
+from .tools.cache import cache_stats
+from .tools.scheduler import format_scheduler_stats, scheduler_stats
+
+
+def _json_size(value) -> int:
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(value).encode("utf-8"))
+
+
+class RunTracer(HookProvider):
+    """
+    Strands hook provider that records a span for every model and tool call.
+
+    Tool spans carry wall time, request/response bytes, memo-cache hits and
+    misses observed during the call, and the error (if any); they are tagged
+    with whether the tool is local or served by the portfolio-db MCP server.
+    Spans are appended to a JSONL file in an OTLP-like layout as they finish.
+    Cache counters are process-wide, so concurrently running tools may see
+    each other's lookups.
+    """
+
+    def __init__(self, mcp_tool_names: Iterable[str] = (), trace_path: Optional[Path] = None):
+        self.mcp_tool_names = set(mcp_tool_names)
+        self.trace_id = uuid.uuid4().hex
+        self.trace_path = Path(trace_path or TRACE_DIR / f"run-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+        self.spans: List[Dict] = []
+        self.started_at = time.time()
+        self._open: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolInvocationEvent, self._before_tool)
+        registry.add_callback(AfterToolInvocationEvent, self._after_tool)
+        registry.add_callback(BeforeModelInvocationEvent, self._before_model)
+        registry.add_callback(AfterModelInvocationEvent, self._after_model)
+
+    def _start(self, key: str, name: str, kind: str, attributes: Dict) -> None:
+        with self._lock:
+            self._open[key] = {
+                "name": name,
+                "kind": kind,
+                "start": time.time_ns(),
+                "perf_start": time.perf_counter(),
+                "cache": cache_stats(),
+                "attributes": attributes,
+            }
+
+    def _finish(self, key: str, attributes: Dict, error: Optional[str] = None) -> None:
+        end = time.time_ns()
+        with self._lock:
+            started = self._open.pop(key, None)
+        if started is None:
+            return
+
+        cache_after = cache_stats()
+        span = {
+            "traceId": self.trace_id,
+            "spanId": uuid.uuid4().hex[:16],
+            "name": started["name"],
+            "kind": started["kind"],
+            "startTimeUnixNano": started["start"],
+            "endTimeUnixNano": end,
+            "attributes": {
+                **started["attributes"],
+                **attributes,
+                "duration_ms": round((time.perf_counter() - started["perf_start"]) * 1000, 3),
+                "cache_hits": cache_after["hits"] - started["cache"]["hits"],
+                "cache_misses": cache_after["misses"] - started["cache"]["misses"],
+            },
+            "status": {"code": "ERROR", "message": error} if error else {"code": "OK"},
+        }
+        with self._lock:
+            self.spans.append(span)
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(span, default=str) + "\n")
+
+    def _before_tool(self, event: BeforeToolInvocationEvent) -> None:
+        name = event.tool_use["name"]
+        self._start(
+            event.tool_use["toolUseId"],
+            name,
+            "tool",
+            {
+                "tool.source": "mcp" if name in self.mcp_tool_names else "local",
+                "bytes_in": _json_size(event.tool_use.get("input")),
+            },
+        )
+
+    def _after_tool(self, event: AfterToolInvocationEvent) -> None:
+        result = event.result or {}
+        error = None
+        if event.exception is not None:
+            error = str(event.exception)
+        elif result.get("status") == "error":
+            error = "tool returned error status"
+        self._finish(event.tool_use["toolUseId"], {"bytes_out": _json_size(result.get("content"))}, error)
+
+    def _model_key(self) -> str:
+        return f"model-{threading.get_ident()}"
+
+    def _before_model(self, event: BeforeModelInvocationEvent) -> None:
+        self._start(self._model_key(), "model", "model", {})
+
+    def _after_model(self, event: AfterModelInvocationEvent) -> None:
+        error = str(event.exception) if event.exception is not None else None
+        stop_response = getattr(event, "stop_response", None)
+        attributes = {"stop_reason": getattr(stop_response, "stop_reason", None)}
+        self._finish(self._model_key(), attributes, error)
+
+    def summary(self) -> List[Dict]:
+        """Aggregate finished spans per tool/model name, slowest total first."""
+        rows = defaultdict(
+            lambda: {"calls": 0, "total_ms": 0.0, "bytes_in": 0, "bytes_out": 0, "cache_hits": 0, "errors": 0}
+        )
+        for span in self.spans:
+            attributes = span["attributes"]
+            row = rows[(span["kind"], attributes.get("tool.source", ""), span["name"])]
+            row["calls"] += 1
+            row["total_ms"] += attributes["duration_ms"]
+            row["bytes_in"] += attributes.get("bytes_in", 0)
+            row["bytes_out"] += attributes.get("bytes_out", 0)
+            row["cache_hits"] += attributes["cache_hits"]
+            row["errors"] += span["status"]["code"] == "ERROR"
+
+        return sorted(
+            ({"kind": kind, "source": source, "name": name, **row} for (kind, source, name), row in rows.items()),
+            key=lambda row: row["total_ms"],
+            reverse=True,
+        )
+
+    def print_summary(self) -> None:
+        """Print a per-run table of where the time went."""
+        rows = self.summary()
+        wall_ms = (time.time() - self.started_at) * 1000
+        print(f"\n📊 Run summary ({wall_ms / 1000:.1f}s wall, trace: {self.trace_path})")
+        if not rows:
+            print("No model or tool calls recorded")
+            return
+
+        header = (
+            f"{'name':<30} {'source':<7} {'calls':>5} {'total s':>9} {'avg ms':>9} "
+            f"{'in KB':>8} {'out KB':>8} {'hits':>5} {'errs':>5}"
+        )
+        print(header)
+        print("-" * len(header))
+        for row in rows:
+            print(
+                f"{row['name']:<30} {row['source'] or row['kind']:<7} {row['calls']:>5} "
+                f"{row['total_ms'] / 1000:>9.2f} {row['total_ms'] / row['calls']:>9.1f} "
+                f"{row['bytes_in'] / 1024:>8.1f} {row['bytes_out'] / 1024:>8.1f} "
+                f"{row['cache_hits']:>5} {row['errors']:>5}"
+            )
+        print(f"Upstream requests: {format_scheduler_stats(scheduler_stats())}")